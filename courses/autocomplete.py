@@ -0,0 +1,210 @@
+"""
+In-process prefix index for course-title autocomplete.
+
+Approved courses are indexed under their normalized title, every word suffix
+of the title ("intro to django" is also found by "django") and their
+instructor's names.  Keys live in one sorted list, so a lookup is a bisect
+plus a short forward scan and never touches the database.
+
+The index is built on first use, kept current by the Course signals, and
+published to the catalog cache as a versioned snapshot so other processes
+sharing that cache can reload it instead of re-querying.  Every change that
+actually alters the index bumps the shared version; a process only publishes
+its own copy when its bump is the very next version, otherwise another
+process changed the index too and it reloads instead of overwriting that
+change.  A snapshot whose version is not the shared one is ignored.
+"""
+
+import threading
+from bisect import bisect_left, insort
+
+from .catalog import catalog_cache
+from .models import Course
+
+SNAPSHOT_KEY = 'autocomplete:snapshot'
+VERSION_KEY  = 'autocomplete:version'
+
+
+def normalize(text):
+    return ' '.join((text or '').lower().split())
+
+
+def _instructor_name(course):
+    instructor = course.instructor
+    if instructor is None:
+        return ''
+    return instructor.get_full_name() or instructor.username
+
+
+class PrefixIndex:
+    """Sorted (key, course_id) pairs plus the display row for each course."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys = []
+        self._entries = {}
+        self.version = 0
+
+    @staticmethod
+    def _keys_for(title, instructor):
+        words = normalize(title).split()
+        keys = {' '.join(words[i:]) for i in range(len(words))}
+        name = normalize(instructor)
+        if name:
+            keys.add(name)
+            keys.update(name.split())
+        return keys
+
+    def load(self, entries, version=0):
+        """Replace the whole index with [id, title, instructor] rows."""
+        keys, by_id = [], {}
+        for course_id, title, instructor in entries:
+            by_id[course_id] = (course_id, title, instructor)
+            keys.extend((key, course_id) for key in self._keys_for(title, instructor))
+        keys.sort()
+        with self._lock:
+            self._keys, self._entries, self.version = keys, by_id, version
+
+    def add(self, course_id, title, instructor):
+        """Index (or re-index) a course; False if it was already indexed like this."""
+        entry = (course_id, title, instructor)
+        with self._lock:
+            if self._entries.get(course_id) == entry:
+                return False
+            self._discard(course_id)
+            self._entries[course_id] = entry
+            for key in self._keys_for(title, instructor):
+                insort(self._keys, (key, course_id))
+            return True
+
+    def remove(self, course_id):
+        """Drop a course; False if it was not indexed."""
+        with self._lock:
+            return self._discard(course_id)
+
+    def _discard(self, course_id):
+        entry = self._entries.pop(course_id, None)
+        if entry is None:
+            return False
+        for key in self._keys_for(entry[1], entry[2]):
+            position = bisect_left(self._keys, (key, course_id))
+            if position < len(self._keys) and self._keys[position] == (key, course_id):
+                del self._keys[position]
+        return True
+
+    def search(self, prefix, limit=10):
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        seen, results = set(), []
+        # A bisect and a short scan: cheap enough to hold the lock for, so
+        # writers can edit the list in place.
+        with self._lock:
+            keys, entries = self._keys, self._entries
+            position = bisect_left(keys, (prefix,))
+            while position < len(keys) and len(results) < limit:
+                key, course_id = keys[position]
+                if not key.startswith(prefix):
+                    break
+                entry = entries.get(course_id)
+                if entry is not None and course_id not in seen:
+                    seen.add(course_id)
+                    results.append(entry)
+                position += 1
+        return results
+
+    def snapshot(self):
+        with self._lock:
+            return [list(entry) for entry in self._entries.values()]
+
+
+_index = PrefixIndex()
+_build_lock = threading.Lock()
+
+
+def _rows_from_db():
+    courses = (
+        Course.objects.filter(status='approved')
+        .select_related('instructor')
+        .only('id', 'title', 'instructor__username',
+              'instructor__first_name', 'instructor__last_name')
+    )
+    return [(c.id, c.title, _instructor_name(c)) for c in courses.iterator(chunk_size=2000)]
+
+
+def _shared_version(cache):
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def _bump(cache):
+    try:
+        return cache.incr(VERSION_KEY)
+    except ValueError:
+        return _shared_version(cache)
+
+
+def _store(cache, version):
+    cache.set(SNAPSHOT_KEY, {'version': version, 'entries': _index.snapshot()}, timeout=None)
+
+
+def get_index():
+    """The process-wide index, (re)loaded from the shared snapshot if it moved on."""
+    cache = catalog_cache()
+    if _index.version and _index.version == _shared_version(cache):
+        return _index
+    with _build_lock:
+        version = _shared_version(cache)
+        if _index.version == version:
+            return _index
+        snapshot = cache.get(SNAPSHOT_KEY)
+        if snapshot is not None and snapshot['version'] == version:
+            _index.load(snapshot['entries'], version)
+        else:
+            _index.load(_rows_from_db(), version)
+            _store(cache, version)
+    return _index
+
+
+def _apply(change):
+    """
+    Apply `change` (which returns whether it altered the index) locally and
+    publish the result if nobody else changed the index meanwhile.
+    """
+    cache = catalog_cache()
+    index = get_index()
+    with _build_lock:
+        expected = index.version + 1
+        if not change(index):
+            return
+        version = _bump(cache)
+        if version == expected:
+            index.version = version
+            _store(cache, version)
+        else:
+            index.version = 0  # stale: reload the shared state on next use
+
+
+def course_changed(course):
+    """Signal hook: index approved courses, drop everything else."""
+    if course.status == 'approved':
+        title, instructor = course.title, _instructor_name(course)
+        _apply(lambda index: index.add(course.id, title, instructor))
+    else:
+        _apply(lambda index: index.remove(course.id))
+
+
+def course_removed(course_id):
+    _apply(lambda index: index.remove(course_id))
+
+
+def rebuild():
+    """Reload the index from the database, e.g. after a bulk import skipped the signals."""
+    cache = catalog_cache()
+    with _build_lock:
+        version = _bump(cache)
+        _index.load(_rows_from_db(), version)
+        _store(cache, version)
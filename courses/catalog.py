@@ -0,0 +1,93 @@
+"""
+Cached course catalog.
+
+The approved-course list is identical for every visitor, so it is built once
+and stored under a versioned key; bumping the version (on any Course change)
+orphans the old entry instead of trying to delete it.  Each student's set of
+enrolled course ids is cached on its own key so the shared list never has to
+be rebuilt per user.
+
+The backend is whichever cache `settings.CATALOG_CACHE_ALIAS` names —
+local-memory by default, file-based or anything else Django supports via
+settings.  Enrolled course ids decide lesson access, so they are only cached
+when that backend is shared by every worker: with a per-process cache an
+enrollment made in one worker could not invalidate the others' copies.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from .models import Course
+
+VERSION_KEY  = 'catalog:version'
+APPROVED_KEY = 'catalog:approved:v{version}'
+ENROLLED_KEY = 'catalog:enrolled:{user_id}'
+
+
+def catalog_cache():
+    return caches[getattr(settings, 'CATALOG_CACHE_ALIAS', 'default')]
+
+
+def shared_across_processes(cache):
+    return not isinstance(cache, (LocMemCache, DummyCache))
+
+
+def _catalog_version(cache):
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # add() so two processes racing on a cold cache agree on one value.
+        cache.add(VERSION_KEY, 1, timeout=None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def invalidate_catalog():
+    cache = catalog_cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, timeout=None)
+
+
+def approved_courses():
+    """All approved courses, newest first, with their instructor joined in."""
+    cache = catalog_cache()
+    key = APPROVED_KEY.format(version=_catalog_version(cache))
+    courses = cache.get(key)
+    if courses is None:
+        courses = list(
+            Course.objects.filter(status='approved')
+            .select_related('instructor')
+            .defer('instructor__password')
+            .order_by('-created_at')
+        )
+        cache.set(key, courses)
+    return courses
+
+
+def enrolled_course_ids(user):
+    """Frozen set of course ids the user is enrolled in."""
+    from enrollments.models import Enrollment
+
+    if not user.is_authenticated:
+        return frozenset()
+    query = (
+        Enrollment.objects.filter(student=user)
+        .exclude(course__status='deleting')
+        .values_list('course_id', flat=True)
+    )
+    cache = catalog_cache()
+    if not shared_across_processes(cache):
+        return frozenset(query)
+    key = ENROLLED_KEY.format(user_id=user.pk)
+    ids = cache.get(key)
+    if ids is None:
+        ids = frozenset(query)
+        cache.set(key, ids)
+    return ids
+
+
+def invalidate_enrolled(*user_ids):
+    catalog_cache().delete_many([ENROLLED_KEY.format(user_id=pk) for pk in user_ids])
@@ -0,0 +1,87 @@
+"""
+Deep copy of a course: lessons, materials, notes, quizzes and questions.
+
+Each model is read once and written back with one `bulk_create`; new primary
+keys come back from the insert and old → new ids are mapped in memory to
+re-point the children.  Material and note files are shared by reference —
+the copies point at the same content-addressed blobs, whose refcounts are
+bumped in one UPDATE.  Enrollments, progress and quiz submissions belong to
+the students of the original run and are not copied.
+
+`bulk_create` skips signals, so the counters are set on the new course
+directly and the search index is filled for the whole tree at the end.
+"""
+
+from django.db import transaction
+
+from quizzes.models import Question, Quiz
+from .catalog import invalidate_catalog
+from .models import Course, CourseNote, Lesson, LessonMaterial
+from .search import reindex_course
+from .storage import retain_blobs
+
+
+def _copy_rows(rows, **fields):
+    """Unsaved copies of `rows` with `fields` overridden; returns (copies, old pks)."""
+    old_pks, copies = [], []
+    for row in rows:
+        old_pks.append(row.pk)
+        row.pk = None
+        row._state.adding = True
+        for name, value in fields.items():
+            setattr(row, name, value(row) if callable(value) else value)
+        copies.append(row)
+    return copies, old_pks
+
+
+def _bulk_create(model, copies, old_pks):
+    """Insert the copies; {old pk: new pk}."""
+    created = model.objects.bulk_create(copies)
+    return dict(zip(old_pks, (row.pk for row in created)))
+
+
+@transaction.atomic
+def clone_course(source, created_by=None, title=None):
+    """Copy `source` and its whole tree into a new pending course and return it."""
+    course = Course.objects.create(
+        title=title or f"{source.title} (copy)",
+        description=source.description,
+        instructor_id=source.instructor_id,
+        created_by=created_by,
+        status='pending',
+        lesson_count=source.lesson_count,
+        published_lesson_count=source.published_lesson_count,
+        total_duration_minutes=source.total_duration_minutes,
+    )
+
+    lessons, old_lessons = _copy_rows(
+        Lesson.objects.filter(course=source).order_by('pk'), course_id=course.pk,
+    )
+    lesson_map = _bulk_create(Lesson, lessons, old_lessons)
+
+    materials, old_materials = _copy_rows(
+        LessonMaterial.objects.filter(lesson__course=source).order_by('pk'),
+        lesson_id=lambda row: lesson_map[row.lesson_id],
+    )
+    _bulk_create(LessonMaterial, materials, old_materials)
+
+    notes, old_notes = _copy_rows(
+        CourseNote.objects.filter(course=source).order_by('pk'), course_id=course.pk,
+    )
+    _bulk_create(CourseNote, notes, old_notes)
+
+    quizzes, old_quizzes = _copy_rows(
+        Quiz.objects.filter(course=source).order_by('pk'), course_id=course.pk,
+    )
+    quiz_map = _bulk_create(Quiz, quizzes, old_quizzes)
+
+    questions, old_questions = _copy_rows(
+        Question.objects.filter(quiz__course=source).order_by('pk'),
+        quiz_id=lambda row: quiz_map[row.quiz_id],
+    )
+    _bulk_create(Question, questions, old_questions)
+
+    retain_blobs([row.file.name for row in materials] + [row.file.name for row in notes])
+    reindex_course(course.pk)
+    invalidate_catalog()
+    return course
@@ -0,0 +1,92 @@
+"""
+Cheap ETag / Last-Modified validators for course and lesson reads.
+
+Validators come from one aggregate per queryset — COUNT(*) and
+MAX(updated_at) — so a 304 can be answered without loading a single row.
+The count catches deletions that leave the newest timestamp unchanged.
+"""
+
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+def queryset_state(queryset, field='updated_at'):
+    """(row count, newest timestamp) for a queryset, in a single query."""
+    row = queryset.order_by().aggregate(count=Count('pk'), latest=Max(field))
+    return row['count'], row['latest']
+
+
+class Validators:
+    """An ETag / Last-Modified pair from queryset states plus any extra keys."""
+
+    def __init__(self, states, *keys):
+        stamps = [latest for _, latest in states if latest is not None]
+        self.last_modified = max(stamps) if stamps else None
+        digest = hashlib.md5(repr((states, keys)).encode(), usedforsecurity=False)
+        self.etag = quote_etag(digest.hexdigest())
+
+    def not_modified(self, request):
+        """A 304 response if the client's copy is current, else None."""
+        last_modified = int(self.last_modified.timestamp()) if self.last_modified else None
+        return get_conditional_response(request, etag=self.etag, last_modified=last_modified)
+
+    def apply(self, response, private=False):
+        response['ETag'] = self.etag
+        if self.last_modified:
+            response['Last-Modified'] = http_date(self.last_modified.timestamp())
+        if private:
+            # Pages that differ per user must not be shared by proxies.
+            response['Cache-Control'] = 'private, no-cache'
+            patch_vary_headers(response, ['Cookie'])
+        return response
+
+
+def page_not_modified(request, validators):
+    """
+    304 for a per-user HTML page, unless flash messages are waiting — a 304
+    would leave them queued for whatever page comes next.
+    """
+    from django.contrib.messages import get_messages
+
+    if len(get_messages(request)):
+        return None
+    return validators.not_modified(request)
+
+
+class ConditionalGetMixin:
+    """
+    ViewSet mixin answering If-None-Match / If-Modified-Since on list and
+    retrieve.  Override `validator_querysets` when the payload also depends
+    on related rows (e.g. nested lessons).
+    """
+
+    def validator_querysets(self, queryset):
+        return [queryset]
+
+    def _validators(self, request, queryset):
+        user_key = request.user.pk if request.user.is_authenticated else None
+        states = [queryset_state(qs) for qs in self.validator_querysets(queryset)]
+        return Validators(states, request.get_full_path(), user_key)
+
+    def list(self, request, *args, **kwargs):
+        validators = self._validators(request, self.filter_queryset(self.get_queryset()))
+        not_modified = validators.not_modified(request)
+        if not_modified is not None:
+            return not_modified
+        return validators.apply(super().list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: kwargs[lookup]}
+        )
+        validators = self._validators(request, queryset)
+        if validators.last_modified is None:
+            return super().retrieve(request, *args, **kwargs)  # let it 404
+        not_modified = validators.not_modified(request)
+        if not_modified is not None:
+            return not_modified
+        return validators.apply(super().retrieve(request, *args, **kwargs))
@@ -0,0 +1,65 @@
+"""
+Denormalized per-course counters.
+
+The columns live on Course and are moved with F() expressions so concurrent
+writers never lose an increment.  `rebuild_counters` recomputes them from the
+source tables in a single UPDATE for when they drift (raw SQL, bulk loads…).
+"""
+
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import Course, Lesson
+
+COUNTER_FIELDS = (
+    'lesson_count',
+    'published_lesson_count',
+    'enrollment_count',
+    'total_duration_minutes',
+)
+
+
+def bump_counters(course_id, **deltas):
+    """Atomically add each delta to the matching counter on one course."""
+    updates = {}
+    for field, delta in deltas.items():
+        if not delta:
+            continue
+        if delta > 0:
+            updates[field] = F(field) + delta
+        else:
+            # Never let drift push a PositiveIntegerField below zero.
+            updates[field] = Greatest(F(field) + delta, Value(0))
+    if course_id and updates:
+        # Touch updated_at too so ETag / Last-Modified validators see the change.
+        Course.objects.filter(pk=course_id).update(updated_at=timezone.now(), **updates)
+
+
+def lesson_counter_values(status, duration_minutes):
+    """The contribution a single lesson makes to its course's counters."""
+    return {
+        'lesson_count':           1,
+        'published_lesson_count': 1 if status == 'published' else 0,
+        'total_duration_minutes': duration_minutes or 0,
+    }
+
+
+def _scalar(queryset, aggregate):
+    subquery = queryset.order_by().values('course').annotate(value=aggregate).values('value')
+    return Coalesce(Subquery(subquery, output_field=IntegerField()), Value(0))
+
+
+def rebuild_counters(queryset=None):
+    """Recompute every counter from scratch; returns the number of courses touched."""
+    from enrollments.models import Enrollment
+
+    if queryset is None:
+        queryset = Course.objects.all()
+    lessons = Lesson.objects.filter(course=OuterRef('pk'))
+    return queryset.update(
+        lesson_count=_scalar(lessons, Count('id')),
+        published_lesson_count=_scalar(lessons, Count('id', filter=Q(status='published'))),
+        total_duration_minutes=_scalar(lessons, Sum('duration_minutes')),
+        enrollment_count=_scalar(Enrollment.objects.filter(course=OuterRef('pk')), Count('id')),
+    )
@@ -0,0 +1,166 @@
+"""
+Chunked, background deletion of a course and everything under it.
+
+`course.delete()` makes Django's collector load every dependent row
+(enrollments, progress, quiz submissions, answers…) into memory and then
+holds the SQLite write lock for the whole cascade.  Instead:
+
+1. `schedule_course_deletion` flips the course to status 'deleting', which
+   the default Course manager hides, drops it from the search index and the
+   catalog caches, and starts a worker thread.
+2. `purge_course` walks the cascade tree leaves-first and removes each table
+   in chunks of `COURSE_DELETE_CHUNK_SIZE` primary keys, one short
+   transaction per chunk, with `_raw_delete` (no model loading, no signals).
+3. Stored files of deleted materials / notes are released once their rows
+   are gone.
+
+Progress lives in the catalog cache under `deletion:<course_id>` so the
+admin course list can show it.  The purge is idempotent: an interrupted run
+is resumed by `manage.py purge_deleting_courses`.
+"""
+
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, models, transaction
+from django.utils import timezone
+
+from .catalog import catalog_cache, invalidate_catalog, invalidate_enrolled
+from .models import Course, UploadSession
+from .outline import invalidate_outline
+from .search import remove_course_from_index
+from .storage import release_blob
+from . import uploads
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_KEY = 'deletion:{course_id}'
+DEFAULT_CHUNK_SIZE = 500
+
+
+def _chunk_size():
+    return getattr(settings, 'COURSE_DELETE_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+
+
+def deletion_progress(course_id):
+    return catalog_cache().get(PROGRESS_KEY.format(course_id=course_id))
+
+
+def _set_progress(course_id, **progress):
+    catalog_cache().set(PROGRESS_KEY.format(course_id=course_id), progress, timeout=None)
+
+
+def deletion_plan(model=Course, path='pk', _depth=0):
+    """
+    [(model, lookup, set_null_field)] in a safe deletion order: children
+    before parents.  `lookup` filters the model's rows belonging to the
+    course; `set_null_field` is set for SET_NULL relations, which are
+    cleared rather than deleted.
+    """
+    if _depth > 10:
+        raise RuntimeError(f"Cascade from Course is too deep at {model.__name__}.")
+    steps = []
+    for relation in model._meta.related_objects:
+        if relation.many_to_many or not relation.field.concrete:
+            continue
+        child, field = relation.related_model, relation.field.name
+        lookup = f'{field}__{path}'
+        on_delete = relation.on_delete
+        if on_delete is models.CASCADE:
+            steps.extend(deletion_plan(child, lookup, _depth + 1))
+        elif on_delete is models.SET_NULL:
+            steps.append((child, lookup, field))
+        elif on_delete is not models.DO_NOTHING:
+            raise RuntimeError(
+                f"{child.__name__}.{field} uses {on_delete.__name__}; "
+                f"teach courses.deletion how to handle it."
+            )
+    steps.append((model, path, None))
+    return steps
+
+
+def _file_fields(model):
+    return [f.name for f in model._meta.concrete_fields if isinstance(f, models.FileField)]
+
+
+def _delete_chunk(model, pks):
+    """Delete one chunk of rows and run the side effects signals would have."""
+    queryset = model._base_manager.filter(pk__in=pks)
+    file_fields = _file_fields(model)
+    files = []
+    if file_fields:
+        for row in queryset.values_list(*file_fields):
+            files.extend(name for name in row if name)
+    students = []
+    if model._meta.label == 'enrollments.Enrollment':
+        students = list(queryset.values_list('student_id', flat=True))
+    if model is UploadSession:
+        for session in queryset:
+            uploads.discard_chunks(session)
+
+    with transaction.atomic():
+        deleted = queryset._raw_delete(queryset.db)
+        for name in files:
+            release_blob(name)
+
+    invalidate_enrolled(*set(students))
+    return deleted
+
+
+def purge_course(course_id):
+    """Remove a course marked 'deleting' and all of its dependents, chunk by chunk."""
+    chunk_size = _chunk_size()
+    plan = deletion_plan()
+    deleted = 0
+    for step, (model, lookup, set_null_field) in enumerate(plan, start=1):
+        table = model._meta.label
+        queryset = model._base_manager.filter(**{lookup: course_id})
+        while True:
+            pks = list(queryset.values_list('pk', flat=True)[:chunk_size])
+            if not pks:
+                break
+            if set_null_field:
+                with transaction.atomic():
+                    model._base_manager.filter(pk__in=pks).update(**{set_null_field: None})
+            else:
+                deleted += _delete_chunk(model, pks)
+            _set_progress(
+                course_id, state='running', table=table, step=step,
+                steps=len(plan), deleted=deleted,
+            )
+    invalidate_outline(course_id)
+    invalidate_catalog()
+    _set_progress(course_id, state='done', table=None, step=len(plan),
+                  steps=len(plan), deleted=deleted, finished_at=timezone.now())
+    return deleted
+
+
+def _run(course_id):
+    try:
+        purge_course(course_id)
+    except Exception:
+        logger.exception("Deleting course %s failed", course_id)
+        progress = deletion_progress(course_id) or {}
+        progress['state'] = 'failed'
+        _set_progress(course_id, **progress)
+    finally:
+        close_old_connections()
+
+
+def schedule_course_deletion(course, background=True):
+    """Hide `course` at once and delete its data in a worker thread."""
+    course.status = 'deleting'
+    course.save(update_fields=['status', 'updated_at'])
+    remove_course_from_index(course.pk)
+    invalidate_enrolled(*course.enrollment.values_list('student_id', flat=True))
+    _set_progress(course.pk, state='queued', table=None, step=0,
+                  steps=len(deletion_plan()), deleted=0)
+    if not background:
+        _run(course.pk)
+        return None
+    # Start only once the status change is committed, so the worker sees it.
+    thread = threading.Thread(target=_run, args=(course.pk,), daemon=True,
+                              name=f'delete-course-{course.pk}')
+    transaction.on_commit(thread.start)
+    return thread
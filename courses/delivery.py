@@ -0,0 +1,160 @@
+"""
+Delivery of material and note files once a view has authorized the download.
+
+`settings.COURSE_FILE_DELIVERY` picks the backend:
+
+* ``python``            — stream from Django, honouring single-range
+                          ``Range`` requests with 206 Partial Content.
+* ``x-sendfile``        — hand the absolute path to Apache / lighttpd.
+* ``x-accel-redirect``  — hand an internal URI to nginx; map
+                          ``COURSE_FILE_ACCEL_PREFIX`` to MEDIA_ROOT with an
+                          ``internal`` location block.
+
+The offloading modes free the worker as soon as headers are written; the
+web server then does ranges and resumption itself.
+
+Content-addressed files get a strong ETag from the hash in their name, so an
+``If-Range`` carrying it stays valid however often the same bytes are
+uploaded again (which refreshes the file's mtime, see courses/storage.py).
+"""
+
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+from .storage import is_blob_name
+
+DEFAULT_CHUNK_SIZE = 256 * 1024
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _delivery_mode():
+    return getattr(settings, 'COURSE_FILE_DELIVERY', 'python')
+
+
+def _chunk_size():
+    return getattr(settings, 'COURSE_FILE_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+
+
+def _content_type(filename):
+    content_type, _ = mimetypes.guess_type(filename)
+    return content_type or 'application/octet-stream'
+
+
+def _offloaded_response(filename, header, value):
+    response = HttpResponse(content_type=_content_type(filename))
+    response[header] = value
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    return response
+
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single-range ``Range`` header, None when the
+    header is absent or unsupported (serve the whole file), or False when it
+    cannot be satisfied.
+    """
+    if not header or size == 0:
+        return None  # an empty file has no byte to point at: send it whole
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None  # multi-range or other units: fall back to 200
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes.
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def file_etag(name):
+    """Strong ETag for a content-addressed file, None for anything else."""
+    if not is_blob_name(name):
+        return None
+    return f'"{os.path.basename(name).split(".", 1)[0]}"'
+
+
+def _range_still_valid(if_range, etag, modified):
+    """Whether an If-Range validator matches the file as it is now."""
+    if if_range.startswith('"'):
+        return etag is not None and if_range == etag
+    if if_range.startswith('W/'):
+        return False  # weak tags never validate a range
+    return parse_http_date_safe(if_range) == modified
+
+
+def _iter_range(handle, start, end, chunk_size):
+    try:
+        handle.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = handle.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        handle.close()
+
+
+def serve_file(request, fieldfile, filename):
+    """Response delivering `fieldfile` as an attachment named `filename`."""
+    mode = _delivery_mode()
+    if mode == 'x-sendfile':
+        return _offloaded_response(filename, 'X-Sendfile', fieldfile.path)
+    if mode == 'x-accel-redirect':
+        prefix = getattr(settings, 'COURSE_FILE_ACCEL_PREFIX', '/protected-media/')
+        return _offloaded_response(
+            filename, 'X-Accel-Redirect', prefix.rstrip('/') + '/' + quote(fieldfile.name)
+        )
+
+    size = fieldfile.size
+    modified = int(os.path.getmtime(fieldfile.path))
+    etag = file_etag(fieldfile.name)
+    byte_range = parse_range(request.headers.get('Range'), size)
+
+    # If-Range: only honour the range if the client's copy is still current.
+    if_range = request.headers.get('If-Range')
+    if byte_range and if_range and not _range_still_valid(if_range.strip(), etag, modified):
+        byte_range = None
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if byte_range is None:
+        response = FileResponse(
+            fieldfile.open('rb'), as_attachment=True, filename=filename
+        )
+        response.block_size = _chunk_size()
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _iter_range(fieldfile.open('rb'), start, end, _chunk_size()),
+            status=206,
+            content_type=_content_type(filename),
+        )
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Disposition'] = content_disposition_header(True, filename)
+
+    response['Accept-Ranges'] = 'bytes'
+    response['Last-Modified'] = http_date(modified)
+    if etag:
+        response['ETag'] = etag
+    return response
@@ -26,20 +26,32 @@ class AdminCourseForm(forms.ModelForm):
             'status':      forms.Select(attrs={'class': CTRL}),
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # 'deleting' is only ever set by the deletion pipeline.
+        self.fields['status'].choices = [
+            choice for choice in self.fields['status'].choices if choice[0] != 'deleting'
+        ]
+
 
 class LessonForm(forms.ModelForm):
     """Instructor adds / edits a lesson (text notes + video URL)."""
 
+    # 1-based place in the course; the stored `order` is gap-based (see courses/ordering.py).
+    position = forms.IntegerField(
+        min_value=1, required=False,
+        widget=forms.NumberInput(attrs={'class': CTRL, 'min': '1', 'placeholder': 'Last'}),
+    )
+
     class Meta:
         model  = Lesson
-        fields = ['title', 'content', 'video_url', 'order', 'duration_minutes', 'status']
+        fields = ['title', 'content', 'video_url', 'duration_minutes', 'status']
         widgets = {
             'title':            forms.TextInput(attrs={'class': CTRL, 'placeholder': 'Lesson title'}),
             'content':          forms.Textarea(attrs={'class': CTRL, 'rows': 8,
                                                       'placeholder': 'Write lesson notes here…'}),
             'video_url':        forms.URLInput(attrs={'class': CTRL,
                                                       'placeholder': 'https://youtube.com/watch?v=… (optional)'}),
-            'order':            forms.NumberInput(attrs={'class': CTRL, 'min': '0'}),
             'duration_minutes': forms.NumberInput(attrs={'class': CTRL, 'min': '0',
                                                          'placeholder': 'e.g. 30'}),
             'status':           forms.Select(attrs={'class': CTRL}),
@@ -0,0 +1,105 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from courses.models import Course, Lesson
+from courses.serializers import CourseSerializer, LessonSerializer
+from elearning.fastlist import compile_serializer
+from elearning.queryplan import query_plan
+from enrollments.models import Enrollment
+from enrollments.serializers import EnrollmentSerializer
+from users.models import User
+
+TARGETS = (
+    ('courses',     Course,     CourseSerializer),
+    ('lessons',     Lesson,     LessonSerializer),
+    ('enrollments', Enrollment, EnrollmentSerializer),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare rows/sec of the regular ModelSerializer path and the values() "
+        "fast path for the course, lesson and enrollment lists, and check that "
+        "both render identical JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0,
+                            help="Insert this many rows per table first; they are rolled back at the end.")
+        parser.add_argument('--page-size', type=int, default=500,
+                            help="Rows serialized per call, as one API page.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['seed']:
+                self._seed(options['seed'])
+            for label, model, serializer_class in TARGETS:
+                self._compare(label, model, serializer_class, options['page_size'])
+            transaction.set_rollback(True)
+
+    def _seed(self, rows):
+        self.stdout.write(f"Seeding {rows} rows per table…")
+        stamp = int(time.time())
+        instructor = User.objects.create(username=f'bench-{stamp}', role='instructor', password='!')
+        per_course = 10
+        courses = Course.objects.bulk_create(
+            [Course(title=f'Benchmark {n}', description='x' * 200, instructor=instructor)
+             for n in range(rows)],
+            batch_size=2000,
+        )
+        Lesson.objects.bulk_create(
+            [Lesson(course=courses[n // per_course], title=f'Lesson {n}', content='y' * 500,
+                    order=(n % per_course + 1) * 1024)
+             for n in range(rows)],
+            batch_size=2000,
+        )
+        students = User.objects.bulk_create(
+            [User(username=f'bench-{stamp}-{n}', role='student', password='!')
+             for n in range(-(-rows // per_course))],
+            batch_size=2000,
+        )
+        Enrollment.objects.bulk_create(
+            [Enrollment(student=students[n // per_course], course=courses[n % len(courses)])
+             for n in range(rows)],
+            batch_size=2000,
+            ignore_conflicts=True,
+        )
+
+    def _compare(self, label, model, serializer_class, size):
+        fast = compile_serializer(serializer_class)
+        if fast is None:
+            raise CommandError(f"{serializer_class.__name__} does not compile to the fast path.")
+        select, prefetch = query_plan(serializer_class)
+        queryset = model._default_manager.all()
+        renderer = JSONRenderer()
+        ids = list(queryset.order_by('pk').values_list('pk', flat=True))
+        pages = [ids[start:start + size] for start in range(0, len(ids), size)]
+
+        started = time.perf_counter()
+        regular = []
+        for page in pages:
+            rows = queryset.filter(pk__in=page).order_by('pk').prefetch_related(*prefetch)
+            if select:
+                rows = rows.select_related(*select)
+            regular.append(renderer.render(serializer_class(rows, many=True).data))
+        regular_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        fast_bodies = []
+        for page in pages:
+            rows = fast.values(queryset.filter(pk__in=page).order_by('pk'))
+            fast_bodies.append(renderer.render(fast.render(rows)))
+        fast_time = time.perf_counter() - started
+
+        if regular != fast_bodies:
+            raise CommandError(f"{label}: the fast path rendered different JSON.")
+        count = len(ids)
+        self.stdout.write(
+            f"{label:<12} {count:>8} rows   "
+            f"serializer {count / max(regular_time, 1e-9):>10,.0f} rows/s   "
+            f"values() {count / max(fast_time, 1e-9):>10,.0f} rows/s   "
+            f"x{regular_time / max(fast_time, 1e-9):.1f}"
+        )
@@ -0,0 +1,195 @@
+import os
+import queue
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import models
+from django.utils import timezone
+
+from courses.models import StoredBlob, UploadSession
+from courses.storage import TMP_DIR as BLOB_TMP_DIR
+from courses.uploads import UPLOAD_TMP_DIR
+
+_DONE = object()
+
+
+def _file_fields():
+    """(model, field name) for every FileField / ImageField in the project."""
+    return [
+        (model, field.name)
+        for model in apps.get_models()
+        for field in model._meta.get_fields()
+        if isinstance(field, models.FileField)
+    ]
+
+
+class _Scanner:
+    """Walks directories on a thread pool and yields bounded batches of files."""
+
+    def __init__(self, media_root, skip, min_mtime, batch_size, workers):
+        self.media_root = media_root
+        self.skip       = skip
+        self.min_mtime  = min_mtime
+        self.batch_size = batch_size
+        self.workers    = workers
+        # Bounded, so fast walkers wait for the database checks instead of
+        # piling paths up in memory.
+        self.batches    = queue.Queue(maxsize=workers * 4)
+
+    def _relative(self, path):
+        return os.path.relpath(path, self.media_root).replace(os.sep, '/')
+
+    def _walk(self, root, recursive):
+        batch, stack = [], [root]
+        while stack:
+            try:
+                entries = os.scandir(stack.pop())
+            except FileNotFoundError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive and self._relative(entry.path) not in self.skip:
+                            stack.append(entry.path)
+                        continue
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    stat = entry.stat(follow_symlinks=False)
+                    if stat.st_mtime > self.min_mtime:
+                        continue  # may belong to an upload that has not committed yet
+                    batch.append((self._relative(entry.path), stat.st_size))
+                    if len(batch) >= self.batch_size:
+                        self.batches.put(batch)
+                        batch = []
+        if batch:
+            self.batches.put(batch)
+
+    def _produce(self, tops):
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = []
+                for top in tops:
+                    # The top directory's own files, then each subdirectory
+                    # as a separate unit of work.
+                    futures.append(pool.submit(self._walk, top, False))
+                    with os.scandir(top) as entries:
+                        for entry in entries:
+                            if (entry.is_dir(follow_symlinks=False)
+                                    and self._relative(entry.path) not in self.skip):
+                                futures.append(pool.submit(self._walk, entry.path, True))
+                for future in futures:
+                    future.result()
+        finally:
+            self.batches.put(_DONE)
+
+    def scan(self, tops):
+        tops = [path for path in tops if os.path.isdir(path)]
+        producer = threading.Thread(target=self._produce, args=(tops,), daemon=True)
+        producer.start()
+        while (batch := self.batches.get()) is not _DONE:
+            yield batch
+        producer.join()
+
+
+class Command(BaseCommand):
+    help = (
+        "Find (and optionally delete) media files that no FileField points at, "
+        "such as files left behind by course and lesson cascades."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*', default=['courses', 'blobs'],
+            help='Directories under MEDIA_ROOT to scan (default: courses blobs).',
+        )
+        mode = parser.add_mutually_exclusive_group()
+        mode.add_argument('--dry-run', action='store_true', help='Only report (the default).')
+        mode.add_argument('--delete', action='store_true', help='Delete the orphaned files.')
+        parser.add_argument('--workers', type=int, default=8, help='Directory-scanning threads.')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Paths checked against the database per query.')
+        parser.add_argument('--min-age', type=int, default=3600,
+                            help='Ignore files modified in the last N seconds (default: 3600).')
+
+    def handle(self, *args, **options):
+        media_root = os.path.abspath(settings.MEDIA_ROOT)
+        delete = options['delete']
+        fields = _file_fields()
+        scanner = _Scanner(
+            media_root,
+            skip={BLOB_TMP_DIR, UPLOAD_TMP_DIR},
+            min_mtime=time.time() - options['min_age'],
+            batch_size=max(options['batch_size'], 1),
+            workers=max(options['workers'], 1),
+        )
+
+        scanned = orphaned = orphaned_bytes = 0
+        tops = [os.path.join(media_root, path) for path in options['paths']]
+        for batch in scanner.scan(tops):
+            scanned += len(batch)
+            names = [name for name, _ in batch]
+            referenced = set()
+            for model, field in fields:
+                referenced.update(
+                    model._base_manager.filter(**{f'{field}__in': names})
+                    .values_list(field, flat=True)
+                )
+            orphans = [(name, size) for name, size in batch if name not in referenced]
+            if not orphans:
+                continue
+            orphaned += len(orphans)
+            orphaned_bytes += sum(size for _, size in orphans)
+            for name, size in orphans:
+                if options['verbosity'] >= 2:
+                    self.stdout.write(f"{name} ({size} bytes)")
+                if delete:
+                    try:
+                        os.remove(os.path.join(media_root, name))
+                    except FileNotFoundError:
+                        pass
+            if delete:
+                StoredBlob.objects.filter(name__in=[name for name, _ in orphans]).delete()
+                # Drop directories the deletions emptied (e.g. a removed lesson's).
+                for parent in {os.path.dirname(name) for name, _ in orphans}:
+                    try:
+                        os.rmdir(os.path.join(media_root, parent))
+                    except OSError:
+                        pass
+
+        abandoned = self._abandoned_uploads(media_root, delete)
+
+        verb = "Deleted" if delete else "Found"
+        self.stdout.write(self.style.SUCCESS(
+            f"Scanned {scanned} file(s). {verb} {orphaned} orphaned file(s) "
+            f"({orphaned_bytes / (1024 * 1024):.1f} MiB) and "
+            f"{abandoned} abandoned upload session(s)."
+        ))
+
+    def _abandoned_uploads(self, media_root, delete):
+        """Chunk directories whose upload session expired or no longer exists."""
+        tmp_root = os.path.join(media_root, UPLOAD_TMP_DIR)
+        if not os.path.isdir(tmp_root):
+            return 0
+        names = []
+        for entry in os.scandir(tmp_root):
+            try:
+                names.append(str(uuid.UUID(entry.name)))
+            except ValueError:
+                continue
+        live = {
+            str(pk) for pk in UploadSession.objects.filter(
+                pk__in=names, expires_at__gt=timezone.now()
+            ).values_list('pk', flat=True)
+        }
+        abandoned = [name for name in names if name not in live]
+        if delete:
+            for name in abandoned:
+                shutil.rmtree(os.path.join(tmp_root, name), ignore_errors=True)
+            UploadSession.objects.filter(expires_at__lte=timezone.now()).delete()
+        return len(abandoned)
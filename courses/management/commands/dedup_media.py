@@ -0,0 +1,75 @@
+import hashlib
+
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from courses.models import CourseNote, LessonMaterial
+from courses.storage import blob_storage, is_blob_name, retain_blob
+
+MODELS = (LessonMaterial, CourseNote)
+
+
+def _sha256(storage, name):
+    digest = hashlib.sha256()
+    with storage.open(name, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Command(BaseCommand):
+    help = (
+        "Move lesson materials and course notes saved under media/courses/ into "
+        "content-addressed blobs, storing identical files once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report how many files and bytes would be deduplicated.',
+        )
+
+    def handle(self, *args, **options):
+        storage = blob_storage()
+        dry_run = options['dry_run']
+        seen, moved, missing, saved_bytes = set(), 0, 0, 0
+
+        # Work per stored name, not per row: cloned courses share files, and
+        # every row using a name has to move before the old file can go.
+        names = set()
+        for model in MODELS:
+            names.update(model.objects.exclude(file='').values_list('file', flat=True).distinct())
+
+        for old_name in sorted(names):
+            if is_blob_name(old_name):
+                continue
+            if not storage.exists(old_name):
+                missing += 1
+                self.stderr.write(f"Missing file: {old_name}")
+                continue
+
+            size = storage.size(old_name)
+            if dry_run:
+                digest = _sha256(storage, old_name)
+            else:
+                with storage.open(old_name, 'rb') as handle:
+                    new_name = storage.save(old_name, File(handle))
+                digest = new_name.rsplit('/', 1)[-1].split('.', 1)[0]
+                with transaction.atomic():
+                    references = sum(
+                        model.objects.filter(file=old_name).update(file=new_name) for model in MODELS
+                    )
+                    retain_blob(new_name, size=size, count=references)
+                storage.delete(old_name)
+
+            moved += 1
+            if digest in seen:
+                saved_bytes += size
+            seen.add(digest)
+
+        verb = "Would move" if dry_run else "Moved"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {moved} file(s) into {len(seen)} blob(s), "
+            f"saving {saved_bytes} byte(s); {missing} file(s) missing."
+        ))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from courses.transfer import export_records, to_csv, to_jsonl
+
+
+class Command(BaseCommand):
+    help = "Stream every course and lesson as JSON Lines (default) or CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=['jsonl', 'csv'], default='jsonl')
+        parser.add_argument('--output', '-o', help='Write to this file instead of stdout.')
+        parser.add_argument('--chunk-size', type=int, default=2000,
+                            help='Rows fetched from the database at a time.')
+
+    def handle(self, *args, **options):
+        encode = to_csv if options['format'] == 'csv' else to_jsonl
+        lines = encode(export_records(chunk_size=options['chunk_size']))
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as out:
+                out.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.transfer import import_records, read_csv, read_jsonl
+
+
+class Command(BaseCommand):
+    help = (
+        "Create or update courses and lessons from a JSON Lines (or CSV) file, "
+        "matching on external_id."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['jsonl', 'csv'],
+                            help='Defaults to the file extension.')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Records written per bulk upsert.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('csv' if path.lower().endswith('.csv') else 'jsonl')
+        reader = read_csv if fmt == 'csv' else read_jsonl
+        try:
+            with open(path, encoding='utf-8-sig', newline='') as lines:
+                report = import_records(reader(lines), batch_size=options['batch_size'])
+        except OSError as exc:
+            raise CommandError(exc)
+
+        for line_no, message in report.errors:
+            self.stderr.write(f"line {line_no}: {message}")
+        if report.error_count > len(report.errors):
+            self.stderr.write(f"... and {report.error_count - len(report.errors)} more error(s)")
+        style = self.style.SUCCESS if report.ok else self.style.WARNING
+        self.stdout.write(style(
+            f"Imported {report.courses} course(s) and {report.lessons} lesson(s); "
+            f"{report.error_count} row(s) skipped."
+        ))
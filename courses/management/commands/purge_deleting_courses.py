@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from courses.deletion import purge_course
+from courses.models import Course
+
+
+class Command(BaseCommand):
+    help = "Finish deleting courses left in the 'deleting' state (e.g. after a restart)."
+
+    def handle(self, *args, **options):
+        course_ids = list(
+            Course.all_objects.filter(status='deleting').values_list('pk', flat=True)
+        )
+        for course_id in course_ids:
+            deleted = purge_course(course_id)
+            self.stdout.write(f"Course {course_id}: removed {deleted} row(s).")
+        self.stdout.write(self.style.SUCCESS(f"Purged {len(course_ids)} course(s)."))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from courses.counters import rebuild_counters
+from courses.models import Course
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored lesson / enrollment / duration counters on every course."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'course_ids', nargs='*', type=int,
+            help='Only rebuild these courses (default: all).',
+        )
+
+    def handle(self, *args, **options):
+        queryset = Course.objects.all()
+        if options['course_ids']:
+            queryset = queryset.filter(pk__in=options['course_ids'])
+        updated = rebuild_counters(queryset)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt counters for {updated} course(s)."))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.search import rebuild_index, search_available
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index over courses, lessons, materials and notes."
+
+    def handle(self, *args, **options):
+        if not search_available():
+            raise CommandError("Full-text search needs the SQLite FTS5 backend.")
+        rows = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {rows} row(s)."))
@@ -0,0 +1,55 @@
+# Generated by Django 5.2 on 2026-10-18 18:26
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    Lesson = apps.get_model('courses', 'Lesson')
+    Enrollment = apps.get_model('enrollments', 'Enrollment')
+
+    def scalar(queryset, aggregate):
+        subquery = queryset.order_by().values('course').annotate(value=aggregate).values('value')
+        return Coalesce(Subquery(subquery, output_field=IntegerField()), Value(0))
+
+    lessons = Lesson.objects.filter(course=OuterRef('pk'))
+    Course.objects.update(
+        lesson_count=scalar(lessons, Count('id')),
+        published_lesson_count=scalar(lessons, Count('id', filter=Q(status='published'))),
+        total_duration_minutes=scalar(lessons, Sum('duration_minutes')),
+        enrollment_count=scalar(Enrollment.objects.filter(course=OuterRef('pk')), Count('id')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0007_coursenote'),
+        ('enrollments', '0003_guestpreview'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='enrollment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='lesson_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='published_lesson_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='total_duration_minutes',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
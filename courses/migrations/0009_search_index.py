@@ -0,0 +1,43 @@
+from django.db import migrations
+
+CREATE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS courses_search_index USING fts5("
+    "title, body, course_id UNINDEXED, lesson_id UNINDEXED, "
+    "tokenize = 'porter unicode61')"
+)
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_SQL)
+    # Backfill from whatever is already in the tables.
+    for sql in (
+        "INSERT INTO courses_search_index (rowid, title, body, course_id, lesson_id) "
+        "SELECT id * 4 + 0, title, description, id, NULL FROM courses_course",
+        "INSERT INTO courses_search_index (rowid, title, body, course_id, lesson_id) "
+        "SELECT id * 4 + 1, title, content, course_id, id FROM courses_lesson",
+        "INSERT INTO courses_search_index (rowid, title, body, course_id, lesson_id) "
+        "SELECT m.id * 4 + 2, m.title, '', l.course_id, l.id "
+        "FROM courses_lessonmaterial m JOIN courses_lesson l ON l.id = m.lesson_id",
+        "INSERT INTO courses_search_index (rowid, title, body, course_id, lesson_id) "
+        "SELECT id * 4 + 3, title, '', course_id, NULL FROM courses_coursenote",
+    ):
+        schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS courses_search_index")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0008_course_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2 on 2026-10-18 18:35
+
+import os
+
+import courses.models
+import courses.storage
+from django.db import migrations, models
+
+
+def backfill_original_filenames(apps, schema_editor):
+    for model_name in ('LessonMaterial', 'CourseNote'):
+        model = apps.get_model('courses', model_name)
+        rows = list(model.objects.filter(original_filename='').only('id', 'file'))
+        for row in rows:
+            row.original_filename = os.path.basename(row.file.name)
+        model.objects.bulk_update(rows, ['original_filename'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0009_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('sha256', models.CharField(max_length=64)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('refcount', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='coursenote',
+            name='original_filename',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='lessonmaterial',
+            name='original_filename',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='coursenote',
+            name='file',
+            field=courses.storage.BlobFileField(storage=courses.storage.blob_storage, upload_to=courses.models.course_note_upload_path),
+        ),
+        migrations.AlterField(
+            model_name='lessonmaterial',
+            name='file',
+            field=courses.storage.BlobFileField(storage=courses.storage.blob_storage, upload_to=courses.models.lesson_material_upload_path),
+        ),
+        migrations.RunPython(backfill_original_filenames, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0011_upload_sessions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='course',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending Approval'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('deleting', 'Being deleted')], default='approved', max_length=10),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2 on 2026-10-18 18:41
+
+from django.db import migrations, models
+
+ORDER_STEP = 1024
+
+
+def respace_lessons(apps, schema_editor):
+    """Spread existing orders ORDER_STEP apart, keeping each course's sequence."""
+    Lesson = apps.get_model('courses', 'Lesson')
+    lessons = Lesson.objects.order_by('course_id', 'order', 'created_at', 'pk').only('pk', 'course_id', 'order')
+    batch, course_id, position = [], None, 0
+    for lesson in lessons.iterator(chunk_size=2000):
+        if lesson.course_id != course_id:
+            course_id, position = lesson.course_id, 0
+        position += 1
+        lesson.order = position * ORDER_STEP
+        batch.append(lesson)
+        if len(batch) >= 2000:
+            Lesson.objects.bulk_update(batch, ['order'])
+            batch = []
+    Lesson.objects.bulk_update(batch, ['order'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0012_course_deleting_status'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(fields=['course', 'order'], name='lesson_course_order_idx'),
+        ),
+        migrations.RunPython(respace_lessons, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+import uuid
+
+import courses.models
+from django.db import migrations, models
+
+
+def populate_external_ids(apps, schema_editor):
+    """Give every existing course and lesson its own natural key."""
+    for model_name in ('Course', 'Lesson'):
+        model = apps.get_model('courses', model_name)
+        batch = []
+        for row in model.objects.filter(external_id__isnull=True).only('pk').iterator(chunk_size=2000):
+            row.external_id = uuid.uuid4().hex
+            batch.append(row)
+            if len(batch) >= 2000:
+                model.objects.bulk_update(batch, ['external_id'])
+                batch = []
+        model.objects.bulk_update(batch, ['external_id'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0013_lesson_gap_ordering'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='external_id',
+            field=models.CharField(max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='external_id',
+            field=models.CharField(max_length=100, null=True),
+        ),
+        migrations.RunPython(populate_external_ids, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='course',
+            name='external_id',
+            field=models.CharField(default=courses.models.new_external_id, help_text='Natural key used by import / export', max_length=100, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='lesson',
+            name='external_id',
+            field=models.CharField(default=courses.models.new_external_id, help_text='Natural key within the course, used by import / export', max_length=100),
+        ),
+        migrations.AddConstraint(
+            model_name='lesson',
+            constraint=models.UniqueConstraint(fields=('course', 'external_id'), name='lesson_course_external_id_uniq'),
+        ),
+    ]
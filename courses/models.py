@@ -1,6 +1,9 @@
+import math
 import os
+import uuid
 from django.db import models
 from users.models import User
+from .storage import BlobFileField
 
 
 def lesson_material_upload_path(instance, filename):
@@ -13,15 +16,30 @@ def course_note_upload_path(instance, filename):
     return f"courses/{instance.course.id}/notes/{filename}"
 
 
+def new_external_id():
+    """Default natural key for rows created here rather than imported."""
+    return uuid.uuid4().hex
+
+
+class VisibleCourseManager(models.Manager):
+    """Hides courses that are being deleted in the background (see courses/deletion.py)."""
+
+    def get_queryset(self):
+        return super().get_queryset().exclude(status='deleting')
+
+
 class Course(models.Model):
     STATUS_CHOICES = [
         ('pending',  'Pending Approval'),
         ('approved', 'Approved'),
         ('rejected', 'Rejected'),
+        ('deleting', 'Being deleted'),
     ]
 
     title       = models.CharField(max_length=255)
     description = models.TextField()
+    external_id = models.CharField(max_length=100, unique=True, default=new_external_id,
+                                   help_text='Natural key used by import / export')
     instructor  = models.ForeignKey(
         User,
         on_delete=models.SET_NULL,
@@ -40,6 +58,19 @@ class Course(models.Model):
     created_at  = models.DateTimeField(auto_now_add=True)
     updated_at  = models.DateTimeField(auto_now=True)
 
+    # Denormalized counters, kept in step by courses.signals.
+    # Run `manage.py rebuild_course_counters` to repair any drift.
+    lesson_count           = models.PositiveIntegerField(default=0, editable=False)
+    published_lesson_count = models.PositiveIntegerField(default=0, editable=False)
+    enrollment_count       = models.PositiveIntegerField(default=0, editable=False)
+    total_duration_minutes = models.PositiveIntegerField(default=0, editable=False)
+
+    objects     = VisibleCourseManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [models.Index(fields=['created_at', 'id'], name='course_created_id_idx')]
+
     def __str__(self):
         return self.title
 
@@ -58,14 +89,23 @@ class Lesson(models.Model):
     title            = models.CharField(max_length=255)
     content          = models.TextField(blank=True, help_text='Written notes / lesson text')
     video_url        = models.URLField(blank=True, null=True, help_text='YouTube / Vimeo / any video URL')
-    order            = models.PositiveIntegerField(default=0)
+    order            = models.PositiveIntegerField(default=0)  # gap-based, see courses/ordering.py
     duration_minutes = models.PositiveIntegerField(default=0)
     status           = models.CharField(max_length=10, choices=STATUS_CHOICES, default='draft')
     created_at       = models.DateTimeField(auto_now_add=True)
     updated_at       = models.DateTimeField(auto_now=True)
+    external_id      = models.CharField(max_length=100, default=new_external_id,
+                                        help_text='Natural key within the course, used by import / export')
 
     class Meta:
-        ordering = ['course', 'order', 'created_at']
+        ordering    = ['course', 'order', 'created_at']
+        indexes     = [
+            models.Index(fields=['course', 'order'], name='lesson_course_order_idx'),
+            models.Index(fields=['created_at', 'id'], name='lesson_created_id_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['course', 'external_id'], name='lesson_course_external_id_uniq'),
+        ]
 
     def __str__(self):
         return f"{self.course.title} — {self.title}"
@@ -76,7 +116,8 @@ class LessonMaterial(models.Model):
 
     lesson      = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name='materials')
     title       = models.CharField(max_length=255, help_text='Display name for this file')
-    file        = models.FileField(upload_to=lesson_material_upload_path)
+    file        = BlobFileField(upload_to=lesson_material_upload_path)
+    original_filename = models.CharField(max_length=255, blank=True, editable=False)
     uploaded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
@@ -99,7 +140,7 @@ class LessonMaterial(models.Model):
 
     @property
     def filename(self):
-        return os.path.basename(self.file.name)
+        return self.original_filename or os.path.basename(self.file.name)
 
 
 class CourseNote(models.Model):
@@ -108,7 +149,8 @@ class CourseNote(models.Model):
 
     course      = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='notes')
     title       = models.CharField(max_length=255)
-    file        = models.FileField(upload_to=course_note_upload_path)
+    file        = BlobFileField(upload_to=course_note_upload_path)
+    original_filename = models.CharField(max_length=255, blank=True, editable=False)
     uploaded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
@@ -131,4 +173,48 @@ class CourseNote(models.Model):
 
     @property
     def filename(self):
-        return os.path.basename(self.file.name)
+        return self.original_filename or os.path.basename(self.file.name)
+
+
+class StoredBlob(models.Model):
+    """Reference count for a content-addressed file (see courses/storage.py)."""
+    name       = models.CharField(max_length=255, unique=True)
+    sha256     = models.CharField(max_length=64)
+    size       = models.PositiveBigIntegerField(default=0)
+    refcount   = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount} refs)"
+
+
+class UploadSession(models.Model):
+    """A resumable, chunked upload of a lesson material or course note (see courses/uploads.py)."""
+    KIND_CHOICES = [
+        ('material', 'Lesson material'),
+        ('note',     'Course note'),
+    ]
+
+    id         = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner      = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions')
+    kind       = models.CharField(max_length=10, choices=KIND_CHOICES)
+    course     = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='upload_sessions')
+    lesson     = models.ForeignKey(Lesson, on_delete=models.CASCADE, null=True, blank=True,
+                                   related_name='upload_sessions')
+    title      = models.CharField(max_length=255)
+    filename   = models.CharField(max_length=255)
+    total_size = models.PositiveBigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.filename} ({self.get_kind_display()})"
+
+    @property
+    def chunk_count(self):
+        return max(1, math.ceil(self.total_size / self.chunk_size))
+
+    def chunk_length(self, index):
+        """Expected size of chunk `index`; only the last one may be short."""
+        return min(self.chunk_size, self.total_size - index * self.chunk_size)
@@ -0,0 +1,103 @@
+"""
+Gap-based lesson ordering.
+
+`Lesson.order` values are spaced ORDER_STEP apart, so putting a lesson
+between two others only rewrites that one lesson: it takes the midpoint of
+its new neighbours.  When two neighbours end up adjacent there is no
+midpoint left and the course is rebalanced (every lesson respaced in one
+`bulk_update`), which happens only after ~10 moves into the same gap.
+
+Bulk reorders (drag and drop of the whole list) go through `apply_order`,
+which rewrites only the rows whose position changed, in one transaction.
+`bulk_update` skips signals, so both paths drop the cached outline
+themselves.
+"""
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import Lesson
+from .outline import invalidate_outline
+
+ORDER_STEP = 1024
+
+
+class ReorderError(ValueError):
+    pass
+
+
+def _ordered(course_id, exclude=None):
+    queryset = Lesson.objects.filter(course_id=course_id)
+    if exclude is not None:
+        queryset = queryset.exclude(pk=exclude)
+    return list(queryset.order_by('order', 'created_at', 'pk').values_list('pk', 'order'))
+
+
+def next_order(course_id):
+    """Order value that places a new lesson last."""
+    current = Lesson.objects.filter(course_id=course_id).aggregate(top=Max('order'))['top']
+    return (current or 0) + ORDER_STEP
+
+
+def _respace(course_id, lesson_ids):
+    """Give `lesson_ids` the orders STEP, 2*STEP, … and save the ones that moved."""
+    now = timezone.now()
+    lessons = Lesson.objects.filter(course_id=course_id).only('pk', 'order', 'updated_at')
+    by_id = {lesson.pk: lesson for lesson in lessons}
+    changed = []
+    for position, lesson_id in enumerate(lesson_ids, start=1):
+        lesson = by_id[lesson_id]
+        if lesson.order != position * ORDER_STEP:
+            lesson.order = position * ORDER_STEP
+            lesson.updated_at = now
+            changed.append(lesson)
+    with transaction.atomic():
+        Lesson.objects.bulk_update(changed, ['order', 'updated_at'], batch_size=500)
+    invalidate_outline(course_id)
+    return len(changed)
+
+
+def rebalance(course_id):
+    """Respace every lesson of a course, keeping the current sequence."""
+    return _respace(course_id, [pk for pk, _ in _ordered(course_id)])
+
+
+def move_lesson(lesson, position):
+    """
+    Put `lesson` at 0-based `position` among its course's other lessons by
+    giving it an order between its new neighbours.  Saves only this row,
+    unless the gap is exhausted and the course has to be rebalanced first.
+    """
+    others = _ordered(lesson.course_id, exclude=lesson.pk)
+    position = max(0, min(position, len(others)))
+    for attempt in range(2):
+        before = others[position - 1][1] if position > 0 else 0
+        after = others[position][1] if position < len(others) else None
+        if after is None:
+            order = before + ORDER_STEP
+        elif after - before >= 2:
+            order = (before + after) // 2
+        elif attempt == 0:
+            rebalance(lesson.course_id)
+            others = _ordered(lesson.course_id, exclude=lesson.pk)
+            continue
+        else:
+            raise ReorderError("Could not find a free slot after rebalancing.")
+        break
+    lesson.order = order
+    if lesson.pk:
+        lesson.save(update_fields=['order', 'updated_at'])
+    return lesson
+
+
+def apply_order(course_id, lesson_ids):
+    """
+    Apply a complete new sequence (e.g. after drag and drop).  `lesson_ids`
+    must list every lesson of the course exactly once.
+    """
+    lesson_ids = [int(pk) for pk in lesson_ids]
+    current = {pk for pk, _ in _ordered(course_id)}
+    if len(lesson_ids) != len(set(lesson_ids)) or set(lesson_ids) != current:
+        raise ReorderError("Send every lesson of the course exactly once.")
+    return _respace(course_id, lesson_ids)
@@ -0,0 +1,68 @@
+"""
+Cached per-course lesson outline.
+
+Lesson pages only need ids, titles, order, status and duration for the
+sidebar, never the `content` text.  The outline is read once per course with
+`.values()`, cached, and dropped by the Lesson signals whenever any lesson in
+the course changes; the next request rebuilds it.  Previous / next neighbours
+are precomputed for both variants so navigation is a dict lookup.
+"""
+
+from .catalog import catalog_cache
+from .models import Lesson
+
+OUTLINE_KEY    = 'outline:{course_id}'
+OUTLINE_FIELDS = ('id', 'title', 'order', 'status', 'duration_minutes')
+
+
+class LessonOutline:
+    """Ordered lesson entries (plain dicts) plus prev/next lookup by lesson id."""
+
+    def __init__(self, lessons):
+        self.lessons = lessons
+        self._neighbours = {}
+        for index, entry in enumerate(lessons):
+            self._neighbours[entry['id']] = (
+                lessons[index - 1] if index > 0 else None,
+                lessons[index + 1] if index + 1 < len(lessons) else None,
+            )
+
+    def __iter__(self):
+        return iter(self.lessons)
+
+    def __len__(self):
+        return len(self.lessons)
+
+    def neighbours(self, lesson_id):
+        """(previous, next) entries around a lesson; (None, None) if absent."""
+        return self._neighbours.get(lesson_id, (None, None))
+
+
+def _build_outline(course_id):
+    lessons = list(
+        Lesson.objects.filter(course_id=course_id)
+        .order_by('order', 'created_at')
+        .values(*OUTLINE_FIELDS)
+    )
+    published = [entry for entry in lessons if entry['status'] == 'published']
+    return {
+        'instructor': LessonOutline(lessons),
+        'student':    LessonOutline(published),
+    }
+
+
+def lesson_outline(course_id, include_drafts=False):
+    """The instructor outline (every lesson) or the student one (published only)."""
+    cache = catalog_cache()
+    key = OUTLINE_KEY.format(course_id=course_id)
+    outlines = cache.get(key)
+    if outlines is None:
+        outlines = _build_outline(course_id)
+        cache.set(key, outlines)
+    return outlines['instructor' if include_drafts else 'student']
+
+
+def invalidate_outline(*course_ids):
+    catalog_cache().delete_many(
+        [OUTLINE_KEY.format(course_id=pk) for pk in course_ids if pk]
+    )
@@ -0,0 +1,217 @@
+"""
+SQLite FTS5 full-text index over courses, lessons, materials and notes.
+
+Every indexed object gets one row whose rowid encodes (object id, kind), so
+the signal handlers can replace or drop a row by rowid without scanning the
+virtual table.  Visibility is applied at query time by joining back to the
+course and lesson tables, which keeps the index free of status bookkeeping.
+
+On any database other than SQLite the index is simply not maintained and
+searches return nothing.
+"""
+
+import re
+
+from django.db import connection
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+SEARCH_TABLE = 'courses_search_index'
+
+KIND_COURSE   = 0
+KIND_LESSON   = 1
+KIND_MATERIAL = 2
+KIND_NOTE     = 3
+KIND_NAMES    = {KIND_COURSE: 'course', KIND_LESSON: 'lesson', KIND_MATERIAL: 'material', KIND_NOTE: 'note'}
+KIND_SLOTS    = 4
+
+# Snippet match markers; control characters can never come from user text.
+MARK_START = '\x02'
+MARK_END   = '\x03'
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def search_available():
+    return connection.vendor == 'sqlite'
+
+
+def _rowid(kind, object_id):
+    return object_id * KIND_SLOTS + kind
+
+
+def _replace_row(kind, object_id, course_id, lesson_id, title, body):
+    if not search_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [_rowid(kind, object_id)])
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, title, body, course_id, lesson_id) "
+            f"VALUES (%s, %s, %s, %s, %s)",
+            [_rowid(kind, object_id), title, body or '', course_id, lesson_id],
+        )
+
+
+def remove_from_index(kind, object_id):
+    if not search_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [_rowid(kind, object_id)])
+
+
+def remove_course_from_index(course_id):
+    """Drop a course and everything under it (for deletes that skip signals)."""
+    if not search_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE course_id = %s", [course_id])
+
+
+def index_course(course):
+    _replace_row(KIND_COURSE, course.pk, course.pk, None, course.title, course.description)
+
+
+def index_lesson(lesson):
+    _replace_row(KIND_LESSON, lesson.pk, lesson.course_id, lesson.pk, lesson.title, lesson.content)
+
+
+def index_material(material):
+    course_id = material.lesson.course_id
+    _replace_row(KIND_MATERIAL, material.pk, course_id, material.lesson_id, material.title, '')
+
+
+def index_note(note):
+    _replace_row(KIND_NOTE, note.pk, note.course_id, None, note.title, '')
+
+
+# (SELECT producing index rows, column holding the course id) per kind.
+_SOURCES = (
+    (f"SELECT id * {KIND_SLOTS} + {KIND_COURSE}, title, description, id, NULL "
+     f"FROM courses_course", 'id'),
+    (f"SELECT id * {KIND_SLOTS} + {KIND_LESSON}, title, content, course_id, id "
+     f"FROM courses_lesson", 'course_id'),
+    (f"SELECT m.id * {KIND_SLOTS} + {KIND_MATERIAL}, m.title, '', l.course_id, l.id "
+     f"FROM courses_lessonmaterial m JOIN courses_lesson l ON l.id = m.lesson_id", 'l.course_id'),
+    (f"SELECT id * {KIND_SLOTS} + {KIND_NOTE}, title, '', course_id, NULL "
+     f"FROM courses_coursenote", 'course_id'),
+)
+
+
+def _insert_sources(cursor, course_id=None):
+    for select, course_column in _SOURCES:
+        sql = f"INSERT INTO {SEARCH_TABLE} (rowid, title, body, course_id, lesson_id) {select}"
+        if course_id is None:
+            cursor.execute(sql)
+        else:
+            cursor.execute(f"{sql} WHERE {course_column} = %s", [course_id])
+
+
+def rebuild_index():
+    """Repopulate the whole index straight from the source tables."""
+    if not search_available():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        _insert_sources(cursor)
+        cursor.execute(f"SELECT COUNT(*) FROM {SEARCH_TABLE}")
+        return cursor.fetchone()[0]
+
+
+def reindex_course(course_id):
+    """Re-index one course and everything under it in a fixed number of statements."""
+    if not search_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE course_id = %s", [course_id])
+        _insert_sources(cursor, course_id)
+
+
+def build_match_query(text):
+    """Turn free text into a safe FTS5 query: quoted terms, last one as a prefix."""
+    tokens = _TOKEN_RE.findall(text or '')
+    if not tokens:
+        return ''
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def highlight(snippet):
+    """Escape a snippet for HTML and turn its match markers into <mark> tags."""
+    html = escape(snippet or '')
+    return mark_safe(html.replace(MARK_START, '<mark>').replace(MARK_END, '</mark>'))
+
+
+def plain(snippet):
+    return (snippet or '').replace(MARK_START, '').replace(MARK_END, '')
+
+
+def _id_list(ids):
+    ids = [int(pk) for pk in ids] or [0]
+    return ', '.join(['%s'] * len(ids)), ids
+
+
+def search(text, user, limit=20, offset=0):
+    """
+    Ranked hits visible to `user` as (total, hits).
+
+    Approved courses are visible to everyone.  Lessons, materials and notes
+    are visible to enrolled students (published lessons only), and to the
+    course's instructor or any admin (drafts included).
+    """
+    from .catalog import enrolled_course_ids
+    from .models import Course
+
+    match = build_match_query(text)
+    if not match or not search_available():
+        return 0, []
+
+    is_admin = bool(user.is_authenticated and user.role == 'admin')
+    taught = []
+    if user.is_authenticated and user.role == 'instructor':
+        taught = list(Course.objects.filter(instructor=user).values_list('id', flat=True))
+    readable = set(taught) | set(enrolled_course_ids(user))
+
+    readable_sql, readable_params = _id_list(readable)
+    taught_sql, taught_params = _id_list(taught)
+    idx = SEARCH_TABLE
+    joins = (
+        f"FROM {idx} "
+        f"JOIN courses_course c ON c.id = {idx}.course_id "
+        f"LEFT JOIN courses_lesson l ON l.id = {idx}.lesson_id"
+    )
+    where = (
+        f"{idx} MATCH %s AND c.status = 'approved' "
+        f"AND ({idx}.rowid %% {KIND_SLOTS} = {KIND_COURSE} "
+        f"     OR %s OR {idx}.course_id IN ({readable_sql})) "
+        f"AND ({idx}.lesson_id IS NULL OR l.status = 'published' "
+        f"     OR %s OR {idx}.course_id IN ({taught_sql}))"
+    )
+    params = [match, is_admin, *readable_params, is_admin, *taught_params]
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) {joins} WHERE {where}", params)
+        total = cursor.fetchone()[0]
+        if not total:
+            return 0, []
+        cursor.execute(
+            f"SELECT {idx}.rowid, {idx}.course_id, {idx}.lesson_id, {idx}.title, c.title, "
+            f"snippet({idx}, 1, %s, %s, '…', 16), bm25({idx}, 10.0, 1.0) AS rank "
+            f"{joins} WHERE {where} ORDER BY rank LIMIT %s OFFSET %s",
+            [MARK_START, MARK_END, *params, limit, offset],
+        )
+        rows = cursor.fetchall()
+
+    hits = []
+    for rowid, course_id, lesson_id, title, course_title, snippet, rank in rows:
+        hits.append({
+            'kind':         KIND_NAMES[rowid % KIND_SLOTS],
+            'id':           rowid // KIND_SLOTS,
+            'course_id':    course_id,
+            'course_title': course_title,
+            'lesson_id':    lesson_id,
+            'title':        title,
+            'snippet':      snippet,
+            'rank':         rank,
+        })
+    return total, hits
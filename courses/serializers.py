@@ -1,16 +1,78 @@
+import os
+
+from django.utils.text import get_valid_filename
 from rest_framework import serializers
-from .models import Course, Lesson
+
+from elearning.fieldsets import SparseFieldsetsSerializerMixin
+from .forms import CourseNoteForm, LessonMaterialForm
+from .models import Course, Lesson, UploadSession
+from .uploads import max_upload_size, received_chunks
 
 
-class LessonSerializer(serializers.ModelSerializer):
+class LessonSerializer(SparseFieldsetsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Lesson
         fields = "__all__"
+        expandable_fields = {"course": "courses.serializers.CourseSerializer"}
 
 
-class CourseSerializer(serializers.ModelSerializer):
+class CourseSerializer(SparseFieldsetsSerializerMixin, serializers.ModelSerializer):
     lessons = LessonSerializer(many=True, read_only=True)
 
     class Meta:
         model = Course
         fields = "__all__"
+        expandable_fields = {
+            "instructor": "users.serializers.PublicUserSerializer",
+            "created_by": "users.serializers.PublicUserSerializer",
+        }
+
+    def validate_status(self, value):
+        if value == "deleting":
+            raise serializers.ValidationError("Delete the course instead.")
+        return value
+
+
+class LessonReorderSerializer(serializers.Serializer):
+    course  = serializers.PrimaryKeyRelatedField(queryset=Course.objects.all())
+    lessons = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    chunk_count = serializers.IntegerField(read_only=True)
+    received    = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSession
+        fields = [
+            "id", "kind", "course", "lesson", "title", "filename", "total_size",
+            "chunk_size", "chunk_count", "received", "expires_at",
+        ]
+        read_only_fields = ["chunk_size", "expires_at"]
+
+    def get_received(self, obj):
+        return received_chunks(obj)
+
+    def validate_filename(self, value):
+        return get_valid_filename(os.path.basename(value))
+
+    def validate_total_size(self, value):
+        if value < 1:
+            raise serializers.ValidationError("The file is empty.")
+        if value > max_upload_size():
+            raise serializers.ValidationError(f"Files are limited to {max_upload_size()} bytes.")
+        return value
+
+    def validate(self, attrs):
+        form_class = LessonMaterialForm if attrs["kind"] == "material" else CourseNoteForm
+        _, ext = os.path.splitext(attrs["filename"])
+        if ext.lower() not in form_class.ALLOWED:
+            raise serializers.ValidationError(
+                {"filename": f"Only {', '.join(form_class.ALLOWED)} files are allowed."}
+            )
+        lesson = attrs.get("lesson")
+        if attrs["kind"] == "material" and (lesson is None or lesson.course_id != attrs["course"].pk):
+            raise serializers.ValidationError({"lesson": "Pick a lesson of this course."})
+        if attrs["kind"] == "note":
+            attrs["lesson"] = None
+        return attrs
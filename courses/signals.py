@@ -0,0 +1,194 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from enrollments.models import Enrollment
+from . import autocomplete
+from .catalog import invalidate_catalog, invalidate_enrolled
+from .counters import bump_counters, lesson_counter_values
+from .models import Course, CourseNote, Lesson, LessonMaterial
+from .outline import invalidate_outline
+from . import search
+from .storage import release_blob, retain_blob
+
+
+# ─────────────────────────────────────────────
+#  Course counters
+# ─────────────────────────────────────────────
+
+@receiver(pre_save, sender=Lesson)
+def remember_lesson_counters(sender, instance, raw=False, **kwargs):
+    """Snapshot the stored row so post_save can apply only the difference."""
+    instance._counter_snapshot = None
+    if raw or instance.pk is None:
+        return
+    instance._counter_snapshot = (
+        Lesson.objects.filter(pk=instance.pk)
+        .values_list('course_id', 'status', 'duration_minutes')
+        .first()
+    )
+
+
+@receiver(post_save, sender=Lesson)
+def update_lesson_counters(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    new = lesson_counter_values(instance.status, instance.duration_minutes)
+    old_row = getattr(instance, '_counter_snapshot', None)
+
+    if created or old_row is None:
+        bump_counters(instance.course_id, **new)
+        return
+
+    old_course_id, old_status, old_duration = old_row
+    old = lesson_counter_values(old_status, old_duration)
+    if old_course_id != instance.course_id:
+        bump_counters(old_course_id, **{k: -v for k, v in old.items()})
+        bump_counters(instance.course_id, **new)
+    else:
+        bump_counters(instance.course_id, **{k: new[k] - old[k] for k in new})
+
+
+@receiver(post_delete, sender=Lesson)
+def release_lesson_counters(sender, instance, **kwargs):
+    old = lesson_counter_values(instance.status, instance.duration_minutes)
+    bump_counters(instance.course_id, **{k: -v for k, v in old.items()})
+
+
+@receiver(post_save, sender=Enrollment)
+def count_enrollment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        bump_counters(instance.course_id, enrollment_count=1)
+
+
+@receiver(post_delete, sender=Enrollment)
+def uncount_enrollment(sender, instance, **kwargs):
+    bump_counters(instance.course_id, enrollment_count=-1)
+
+
+# ─────────────────────────────────────────────
+#  Catalog cache
+# ─────────────────────────────────────────────
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+def expire_catalog(sender, **kwargs):
+    # Lessons too: the cached list carries each course's lesson_count.
+    invalidate_catalog()
+
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def expire_enrolled_ids(sender, instance, **kwargs):
+    invalidate_enrolled(instance.student_id)
+
+
+# ─────────────────────────────────────────────
+#  Lesson outline
+# ─────────────────────────────────────────────
+
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+def expire_outline(sender, instance, **kwargs):
+    snapshot = getattr(instance, '_counter_snapshot', None)
+    old_course_id = snapshot[0] if snapshot else None
+    invalidate_outline(instance.course_id, old_course_id)
+
+
+# ─────────────────────────────────────────────
+#  Full-text search index
+# ─────────────────────────────────────────────
+
+@receiver(post_save, sender=Course)
+def index_course(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_course(instance)
+
+
+@receiver(post_save, sender=Lesson)
+def index_lesson(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_lesson(instance)
+
+
+@receiver(post_save, sender=LessonMaterial)
+def index_material(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_material(instance)
+
+
+@receiver(post_save, sender=CourseNote)
+def index_note(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_note(instance)
+
+
+@receiver(post_delete, sender=Course)
+def unindex_course(sender, instance, **kwargs):
+    search.remove_from_index(search.KIND_COURSE, instance.pk)
+
+
+@receiver(post_delete, sender=Lesson)
+def unindex_lesson(sender, instance, **kwargs):
+    search.remove_from_index(search.KIND_LESSON, instance.pk)
+
+
+@receiver(post_delete, sender=LessonMaterial)
+def unindex_material(sender, instance, **kwargs):
+    search.remove_from_index(search.KIND_MATERIAL, instance.pk)
+
+
+@receiver(post_delete, sender=CourseNote)
+def unindex_note(sender, instance, **kwargs):
+    search.remove_from_index(search.KIND_NOTE, instance.pk)
+
+
+# ─────────────────────────────────────────────
+#  Autocomplete prefix index
+# ─────────────────────────────────────────────
+
+@receiver(post_save, sender=Course)
+def refresh_autocomplete(sender, instance, raw=False, **kwargs):
+    if not raw:
+        autocomplete.course_changed(instance)
+
+
+@receiver(post_delete, sender=Course)
+def drop_from_autocomplete(sender, instance, **kwargs):
+    autocomplete.course_removed(instance.pk)
+
+
+# ─────────────────────────────────────────────
+#  Stored file references
+# ─────────────────────────────────────────────
+
+@receiver(pre_save, sender=LessonMaterial)
+@receiver(pre_save, sender=CourseNote)
+def remember_stored_file(sender, instance, raw=False, **kwargs):
+    instance._stored_file_snapshot = None
+    if raw or instance.pk is None:
+        return
+    instance._stored_file_snapshot = (
+        sender.objects.filter(pk=instance.pk).values_list('file', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=LessonMaterial)
+@receiver(post_save, sender=CourseNote)
+def retain_stored_file(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_name = getattr(instance, '_stored_file_snapshot', None)
+    new_name = instance.file.name
+    if not created and old_name == new_name:
+        return
+    retain_blob(new_name)
+    if old_name:
+        release_blob(old_name)
+
+
+@receiver(post_delete, sender=LessonMaterial)
+@receiver(post_delete, sender=CourseNote)
+def release_stored_file(sender, instance, **kwargs):
+    release_blob(instance.file.name)
@@ -0,0 +1,43 @@
+"""
+Short-lived signed download links for lesson materials.
+
+LessonDetailView has already checked access when it renders the page, so it
+mints a token carrying the stored file name and the download name, signed
+with SECRET_KEY and timestamped.  The download view only verifies the HMAC
+and the age — no session, user, material or enrollment lookups — and a
+leaked link stops working once `SIGNED_DOWNLOAD_MAX_AGE` seconds pass.
+"""
+
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.urls import reverse
+
+SALT = 'courses.signed-download'
+DEFAULT_MAX_AGE = 600
+
+
+def max_age():
+    return getattr(settings, 'SIGNED_DOWNLOAD_MAX_AGE', DEFAULT_MAX_AGE)
+
+
+def sign_download(fieldfile, filename):
+    token = signing.dumps({'f': fieldfile.name, 'n': filename}, salt=SALT, compress=True)
+    return reverse('courses:signed_download', args=[token])
+
+
+def verify_download(token):
+    """(stored name, download name); raises signing.BadSignature (or its
+    SignatureExpired subclass) for tampered or stale tokens."""
+    payload = signing.loads(token, salt=SALT, max_age=max_age())
+    return payload['f'], payload['n']
+
+
+def freshness_window():
+    """
+    Changes every half max-age.  Folding it into a page's ETag means a
+    revalidated (304) page never carries links with less than half their
+    lifetime left.
+    """
+    return int(time.time() // max(max_age() // 2, 1))
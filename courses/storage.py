@@ -0,0 +1,180 @@
+"""
+Content-addressed storage for lesson materials and course notes.
+
+Uploads are hashed with SHA-256 while they are streamed to a temporary file
+and then moved to ``blobs/<aa>/<digest><ext>``, so the same syllabus uploaded
+to twenty lessons is stored once.  The `upload_to` path only contributes the
+extension; BlobFileField records the uploaded name in the model's
+`original_filename` for display and downloads.
+
+Each blob has a StoredBlob row counting the LessonMaterial / CourseNote rows
+that point at it.  The signals call `retain_blob` / `release_blob`, and the
+file is only removed when the last reference goes away.
+"""
+
+import hashlib
+import os
+import tempfile
+from collections import Counter
+
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.fields.files import FieldFile
+
+BLOB_DIR = 'blobs'
+TMP_DIR  = 'blobs/tmp'
+
+
+def blob_name(digest, ext=''):
+    return f'{BLOB_DIR}/{digest[:2]}/{digest}{ext.lower()}'
+
+
+def is_blob_name(name):
+    return bool(name) and name.startswith(BLOB_DIR + '/') and not name.startswith(TMP_DIR + '/')
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage that names files after the SHA-256 of their content."""
+
+    def get_available_name(self, name, max_length=None):
+        # The final name comes from the content, so there is nothing to
+        # disambiguate here.
+        return name
+
+    def _save(self, name, content):
+        _, ext = os.path.splitext(name)
+        tmp_dir = self.path(TMP_DIR)
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    out.write(chunk)
+
+            name = blob_name(digest.hexdigest(), ext)
+            full_path = self.path(name)
+            if os.path.exists(full_path):
+                os.remove(tmp_path)
+                # Reused: refresh the mtime so collect_orphaned_media's
+                # --min-age keeps it until the new reference is committed.
+                os.utime(full_path)
+            else:
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                os.replace(tmp_path, full_path)
+                if self.file_permissions_mode is not None:
+                    os.chmod(full_path, self.file_permissions_mode)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return name
+
+
+_blob_storage = ContentAddressedStorage()
+
+
+def blob_storage():
+    """Storage callable for the material and note FileFields."""
+    return _blob_storage
+
+
+class BlobFieldFile(FieldFile):
+    def save(self, name, content, save=True):
+        # `name` is still what the user uploaded; remember it before the
+        # storage swaps it for the content hash.
+        self.instance.original_filename = os.path.basename(name)
+        super().save(name, content, save)
+
+
+class BlobFileField(models.FileField):
+    """FileField on content-addressed storage that keeps the upload's name."""
+    attr_class = BlobFieldFile
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('storage', blob_storage)
+        super().__init__(*args, **kwargs)
+
+
+def retain_blob(name, size=None, count=1):
+    """Add `count` references (default one) to the blob stored under `name`."""
+    from .models import StoredBlob
+
+    if not is_blob_name(name):
+        return
+    if StoredBlob.objects.filter(name=name).update(refcount=F('refcount') + count):
+        return
+    if size is None:
+        size = _blob_storage.size(name) if _blob_storage.exists(name) else 0
+    try:
+        with transaction.atomic():
+            StoredBlob.objects.create(
+                name=name,
+                sha256=os.path.splitext(os.path.basename(name))[0],
+                size=size,
+                refcount=count,
+            )
+    except IntegrityError:
+        # Another request created the row first.
+        StoredBlob.objects.filter(name=name).update(refcount=F('refcount') + count)
+
+
+def retain_blobs(names):
+    """Add one reference per occurrence in `names`, in a single UPDATE."""
+    from .models import StoredBlob
+
+    counts = Counter(name for name in names if is_blob_name(name))
+    if not counts:
+        return
+    StoredBlob.objects.filter(name__in=counts).update(
+        refcount=F('refcount') + Case(
+            *[When(name=name, then=Value(count)) for name, count in counts.items()],
+            default=Value(0),
+        )
+    )
+
+
+def release_blob(name):
+    """
+    Drop one reference to `name`; the file goes once nothing points at it.
+    Files saved before content addressing have no StoredBlob row and are
+    removed as soon as no material or note (e.g. of a cloned course) still
+    uses them.
+    """
+    from .models import StoredBlob
+
+    if not name:
+        return
+    if not is_blob_name(name):
+        if not _in_use(name):
+            _delete_after_commit(name)
+        return
+    with transaction.atomic():
+        StoredBlob.objects.filter(name=name).update(refcount=F('refcount') - 1)
+        deleted, _ = StoredBlob.objects.filter(name=name, refcount__lte=0).delete()
+    if deleted:
+        _delete_after_commit(name)
+
+
+def _in_use(name):
+    from .models import CourseNote, LessonMaterial, StoredBlob
+
+    if is_blob_name(name):
+        return StoredBlob.objects.filter(name=name).exists()
+    return (
+        LessonMaterial.objects.filter(file=name).exists()
+        or CourseNote.objects.filter(file=name).exists()
+    )
+
+
+def _delete_after_commit(name):
+    def delete():
+        # A concurrent save of the same content may have found the file
+        # still on disk and retained it again since the release.
+        if not _in_use(name):
+            _blob_storage.delete(name)
+
+    transaction.on_commit(delete)
@@ -1,3 +1,341 @@
-from django.test import TestCase
+import io
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+
+from enrollments.models import Enrollment
+from quizzes.models import Quiz
+from users.models import User
+from . import autocomplete
+from .catalog import catalog_cache, enrolled_course_ids
+from .deletion import schedule_course_deletion
+from .delivery import parse_range, serve_file
+from .models import Course, Lesson, LessonMaterial, StoredBlob, UploadSession
+from .ordering import ORDER_STEP, ReorderError, apply_order, move_lesson, next_order
+from .storage import blob_storage
+from .transfer import import_records, read_jsonl
+from .uploads import AssembledUpload, ChunkError, received_chunks, write_chunk
+
+
+class CourseBeingDeletedTests(TestCase):
+    """A course in the 'deleting' state disappears from every API list at once."""
+
+    def setUp(self):
+        self.instructor = User.objects.create_user('teacher', password='x', role='instructor')
+        self.student = User.objects.create_user('learner', password='x', role='student')
+        self.kept = Course.objects.create(title='Kept', description='x', instructor=self.instructor)
+        self.doomed = Course.objects.create(title='Doomed', description='x', instructor=self.instructor)
+        for course in (self.kept, self.doomed):
+            Lesson.objects.create(course=course, title=f'{course.title} 1', status='published')
+            Enrollment.objects.create(student=self.student, course=course)
+            Quiz.objects.create(course=course, title=f'{course.title} quiz', instructor=self.instructor)
+
+    def _course_ids(self, user, url, field='course'):
+        self.client.force_login(user)
+        return {row[field] for row in self.client.get(url, secure=True).json()['results']}
+
+    def test_child_rows_of_a_deleting_course_are_hidden(self):
+        enrolled_course_ids(self.student)  # cached before the deletion starts
+
+        # Inside a test transaction the purge thread never starts, so the
+        # rows stay in the database while the course is marked 'deleting'.
+        schedule_course_deletion(self.doomed)
+
+        kept = {self.kept.pk}
+        self.assertEqual(self._course_ids(self.instructor, '/api/lessons/'), kept)
+        self.assertEqual(self._course_ids(self.instructor, '/api/quizzes/'), kept)
+        self.assertEqual(self._course_ids(self.student, '/api/enrollments/'), kept)
+        self.assertEqual(self._course_ids(self.student, '/api/lessons/'), kept)
+        self.assertEqual(enrolled_course_ids(self.student), kept)
+
+
+
+class LessonOrderingTests(TestCase):
+    def setUp(self):
+        self.course = Course.objects.create(title='Ordering', description='x')
+
+    def _lesson(self, title, order):
+        return Lesson.objects.create(course=self.course, title=title, order=order)
+
+    def _sequence(self):
+        return list(Lesson.objects.filter(course=self.course).order_by('order').values_list('title', 'order'))
+
+    def test_next_order_goes_after_the_last_lesson(self):
+        self.assertEqual(next_order(self.course.pk), ORDER_STEP)
+        self._lesson('a', 5000)
+        self.assertEqual(next_order(self.course.pk), 5000 + ORDER_STEP)
+
+    def test_move_takes_the_midpoint_and_touches_only_that_lesson(self):
+        self._lesson('a', ORDER_STEP)
+        self._lesson('b', 2 * ORDER_STEP)
+        c = self._lesson('c', 3 * ORDER_STEP)
+        move_lesson(c, 0)
+        self.assertEqual(self._sequence(), [('c', ORDER_STEP // 2), ('a', ORDER_STEP), ('b', 2 * ORDER_STEP)])
+        move_lesson(c, 1)
+        self.assertEqual(self._sequence(), [('a', ORDER_STEP), ('c', 3 * ORDER_STEP // 2), ('b', 2 * ORDER_STEP)])
+
+    def test_move_into_an_exhausted_gap_rebalances_first(self):
+        self._lesson('a', 10)
+        self._lesson('b', 11)
+        c = self._lesson('c', 12)
+        move_lesson(c, 1)
+        self.assertEqual(self._sequence(), [
+            ('a', ORDER_STEP), ('c', 3 * ORDER_STEP // 2), ('b', 2 * ORDER_STEP),
+        ])
+
+    def test_apply_order_needs_every_lesson_exactly_once(self):
+        a, b, c = (self._lesson(title, (i + 1) * ORDER_STEP) for i, title in enumerate('abc'))
+        for ids in ([a.pk, b.pk], [a.pk, b.pk, c.pk, c.pk], [a.pk, b.pk, c.pk + 1000]):
+            with self.assertRaises(ReorderError):
+                apply_order(self.course.pk, ids)
+        self.assertEqual(apply_order(self.course.pk, [str(c.pk), a.pk, b.pk]), 3)
+        self.assertEqual([title for title, _ in self._sequence()], ['c', 'a', 'b'])
+        self.assertEqual(apply_order(self.course.pk, [c.pk, a.pk, b.pk]), 0)
+
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        catalog_cache().clear()
+        autocomplete._index.load([], 0)
+        self.instructor = User.objects.create_user(
+            'ada', password='x', role='instructor', first_name='Ada', last_name='Lovelace'
+        )
+
+    def _titles(self, prefix):
+        return [title for _, title, _ in autocomplete.get_index().search(prefix)]
+
+    def test_finds_title_prefixes_word_suffixes_and_instructors(self):
+        Course.objects.create(title='Intro to Django', description='x', instructor=self.instructor)
+        self.assertEqual(self._titles('intro'), ['Intro to Django'])
+        self.assertEqual(self._titles('djan'), ['Intro to Django'])
+        self.assertEqual(self._titles('lovel'), ['Intro to Django'])
+        self.assertEqual(self._titles('python'), [])
+
+    def test_unapproved_and_deleted_courses_drop_out(self):
+        course = Course.objects.create(title='Rust basics', description='x', instructor=self.instructor)
+        course.status = 'pending'
+        course.save()
+        self.assertEqual(self._titles('rust'), [])
+        course.status = 'approved'
+        course.save()
+        course.delete()
+        self.assertEqual(self._titles('rust'), [])
+
+    def test_a_change_that_alters_nothing_is_not_published(self):
+        Course.objects.create(title='Go', description='x', instructor=self.instructor)
+        version = autocomplete.get_index().version
+        Course.objects.create(title='Draft', description='x', status='pending')
+        self.assertEqual(catalog_cache().get(autocomplete.VERSION_KEY), version)
+
+    def test_reloads_what_another_process_published(self):
+        Course.objects.create(title='Haskell', description='x', instructor=self.instructor)
+        cache = catalog_cache()
+        # Another process indexes a course this one never saw a signal for.
+        version = cache.incr(autocomplete.VERSION_KEY)
+        cache.set(autocomplete.SNAPSHOT_KEY, {
+            'version': version,
+            'entries': autocomplete._index.snapshot() + [[999, 'Elixir', '']],
+        })
+        self.assertEqual(self._titles('elix'), ['Elixir'])
+        self.assertEqual(self._titles('hask'), ['Haskell'])
+
+    def test_a_stale_snapshot_is_rebuilt_from_the_database(self):
+        Course.objects.create(title='Erlang', description='x', instructor=self.instructor)
+        cache = catalog_cache()
+        cache.set(autocomplete.SNAPSHOT_KEY, {'version': -1, 'entries': []})
+        cache.incr(autocomplete.VERSION_KEY)
+        self.assertEqual(self._titles('erl'), ['Erlang'])
+
+
+class MediaTestCase(TestCase):
+    """Runs against a throwaway MEDIA_ROOT, never the real media directory."""
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+
+class ParseRangeTests(TestCase):
+    def test_satisfiable_ranges(self):
+        self.assertEqual(parse_range('bytes=0-499', 1000), (0, 499))
+        self.assertEqual(parse_range('bytes=500-', 1000), (500, 999))
+        self.assertEqual(parse_range('bytes=900-5000', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=-100', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=-5000', 1000), (0, 999))
+        self.assertEqual(parse_range(' bytes=10-10 ', 1000), (10, 10))
+
+    def test_unsatisfiable_ranges(self):
+        self.assertIs(parse_range('bytes=1000-', 1000), False)
+        self.assertIs(parse_range('bytes=10-5', 1000), False)
+        self.assertIs(parse_range('bytes=-0', 1000), False)
+
+    def test_ignored_headers_serve_the_whole_file(self):
+        for header in (None, '', 'bytes=-', 'bytes=0-1,5-6', 'items=0-1', 'bytes=a-b'):
+            self.assertIsNone(parse_range(header, 1000), header)
+
+    def test_empty_file(self):
+        for header in ('bytes=-5', 'bytes=0-', 'bytes=0-0'):
+            self.assertIsNone(parse_range(header, 0), header)
+
+
+class DeliveryTests(MediaTestCase):
+    def _get(self, name, **headers):
+        request = RequestFactory().get('/download/', headers=headers)
+        return serve_file(request, LessonMaterial(file=name).file, 'notes.pdf')
+
+    def test_if_range_etag_survives_a_reupload_of_the_same_bytes(self):
+        name = blob_storage().save('a.pdf', ContentFile(b'0123456789'))
+        os.utime(blob_storage().path(name), (0, 0))
+        first = self._get(name)
+        etag, modified = first['ETag'], first['Last-Modified']
+
+        self.assertEqual(blob_storage().save('b.pdf', ContentFile(b'0123456789')), name)
+
+        resumed = self._get(name, Range='bytes=4-', If_Range=etag)
+        self.assertEqual(resumed.status_code, 206)
+        self.assertEqual(b''.join(resumed.streaming_content), b'456789')
+        # A date validator still falls back to the whole file once it moved.
+        self.assertEqual(self._get(name, Range='bytes=4-', If_Range=modified).status_code, 200)
+        self.assertEqual(self._get(name, Range='bytes=4-', If_Range='"other"').status_code, 200)
+
+    def test_range_on_an_empty_file_is_served_whole(self):
+        name = blob_storage().save('empty.pdf', ContentFile(b''))
+        response = self._get(name, Range='bytes=-5')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'')
+
+
+
+class StoredBlobTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        course = Course.objects.create(title='Storage', description='x')
+        self.lesson = Lesson.objects.create(course=course, title='Files')
+
+    def _material(self, filename, data):
+        material = LessonMaterial(lesson=self.lesson, title=filename)
+        material.file.save(filename, ContentFile(data))
+        return material
+
+    def _refcount(self, name):
+        return StoredBlob.objects.filter(name=name).values_list('refcount', flat=True).first()
+
+    def test_duplicate_uploads_share_one_file_until_the_last_is_deleted(self):
+        first = self._material('week1.pdf', b'same bytes')
+        second = self._material('copy.pdf', b'same bytes')
+        name = first.file.name
+        self.assertEqual(second.file.name, name)
+        self.assertEqual(second.filename, 'copy.pdf')
+        self.assertEqual(self._refcount(name), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(self._refcount(name), 1)
+        self.assertTrue(blob_storage().exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertIsNone(self._refcount(name))
+        self.assertFalse(blob_storage().exists(name))
+
+    def test_replacing_a_file_releases_the_old_one(self):
+        material = self._material('draft.pdf', b'draft')
+        old_name = material.file.name
+        with self.captureOnCommitCallbacks(execute=True):
+            material.file.save('final.pdf', ContentFile(b'final'))
+        self.assertIsNone(self._refcount(old_name))
+        self.assertFalse(blob_storage().exists(old_name))
+        self.assertEqual(self._refcount(material.file.name), 1)
+
+class ChunkedUploadTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.session = UploadSession(filename='big.pdf', total_size=10, chunk_size=4)
+        self.body = b'abcdefghij'
+
+    def _write(self, index, data=None):
+        if data is None:
+            data = self.body[index * 4:(index + 1) * 4]
+        write_chunk(self.session, index, io.BytesIO(data))
+
+    def test_chunks_in_any_order_assemble_in_sequence(self):
+        for index in (2, 0, 1):
+            self._write(index)
+        self.assertEqual(received_chunks(self.session), [0, 1, 2])
+        self.assertEqual(b''.join(AssembledUpload(self.session).chunks(3)), self.body)
+
+    def test_a_short_or_long_chunk_leaves_nothing_behind(self):
+        with self.assertRaises(ChunkError):
+            self._write(0, b'ab')
+        with self.assertRaises(ChunkError):
+            self._write(2, b'ijk')
+        with self.assertRaises(ChunkError):
+            self._write(3, b'')
+        self.assertEqual(received_chunks(self.session), [])
+        self.assertEqual(os.listdir(blob_storage().path(f'uploads/tmp/{self.session.pk}')), [])
+
+    def test_concurrent_retries_of_one_chunk(self):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: self._write(1), range(32)))
+        self.assertEqual(received_chunks(self.session), [1])
+        self.assertEqual(os.listdir(blob_storage().path(f'uploads/tmp/{self.session.pk}')), ['000001.part'])
+
+
+class TransferTests(TestCase):
+    def setUp(self):
+        instructor = User.objects.create_user('grace', password='x', role='instructor')
+        course = Course.objects.create(title='Compilers', description='x', instructor=instructor)
+        Lesson.objects.create(course=course, title='Parsing', order=1024, duration_minutes=30)
+        Lesson.objects.create(course=course, title='Codegen — part 1', order=2048, status='published')
+        Course.objects.create(title='Unassigned', description='x', status='pending')
+
+    def _rows(self):
+        return (
+            list(Course.objects.order_by('pk').values_list('external_id', 'title', 'status', 'instructor')),
+            list(Lesson.objects.order_by('pk').values_list('course', 'external_id', 'title', 'order', 'status')),
+        )
+
+    def test_reimporting_an_export_changes_nothing(self):
+        before = self._rows()
+        exported = io.StringIO()
+        call_command('export_courses', stdout=exported)
+        self.assertEqual(len(exported.getvalue().splitlines()), 4)
+
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', encoding='utf-8', delete=False) as dump:
+            dump.write(exported.getvalue())
+        self.addCleanup(os.remove, dump.name)
+        out, err = io.StringIO(), io.StringIO()
+        call_command('import_courses', dump.name, stdout=out, stderr=err)
+
+        self.assertIn('Imported 2 course(s) and 2 lesson(s); 0 row(s) skipped.', out.getvalue())
+        self.assertEqual(err.getvalue(), '')
+        self.assertEqual(self._rows(), before)
+
+    def test_bad_rows_are_reported_by_line_and_the_rest_written(self):
+        lines = [
+            '{"type": "course", "external_id": "c-1", "title": "Networks"}\n',
+            '{"type": "lesson", "course": "nope", "external_id": "l-1", "title": "Lost"}\n',
+            '\n',
+            '{"type": "quiz"}\n',
+            'not json\n',
+            '{"type": "lesson", "course": "c-1", "external_id": "l-1", "title": "Sockets", "order": -1}\n',
+            '{"type": "lesson", "course": "c-1", "external_id": "l-2", "title": "TCP"}\n',
+        ]
+        report = import_records(read_jsonl(lines))
+
+        errors = dict(report.errors)
+        self.assertEqual(sorted(errors), [2, 4, 5, 6])
+        self.assertEqual(errors[2], "Unknown course 'nope'.")
+        self.assertEqual((report.courses, report.lessons), (1, 1))
+        self.assertEqual(
+            list(Lesson.objects.filter(course__external_id='c-1').values_list('title', flat=True)),
+            ['TCP'],
+        )
@@ -0,0 +1,361 @@
+"""
+Streaming bulk import / export of courses and lessons.
+
+Records are flat dicts, one per line of JSON Lines (or one per CSV row):
+
+    {"type": "course", "external_id": "c-101", "title": ..., "description": ...,
+     "status": "approved", "instructor": "<username>"}
+    {"type": "lesson", "course": "c-101", "external_id": "l-1", "title": ...,
+     "content": ..., "video_url": ..., "order": 1024, "duration_minutes": 30,
+     "status": "published"}
+
+`external_id` is the natural key: courses are matched on it globally, lessons
+within their course.  Export walks both tables with `.values().iterator()`;
+import buffers at most `batch_size` records and writes each batch with one
+upserting `bulk_create`, so memory does not grow with the catalog.  Bad rows
+are reported with their line number and skipped; the rest of the batch is
+still written.
+
+`bulk_create` skips signals, so `import_records` finishes by rebuilding the
+counters and caches itself and re-indexing the courses it touched.
+"""
+
+import csv
+import io
+import json
+
+from django.db import DatabaseError, transaction
+from django.db.models import Max
+
+from users.models import User
+from . import autocomplete, search
+from .catalog import invalidate_catalog
+from .counters import rebuild_counters
+from .models import Course, Lesson
+from .ordering import ORDER_STEP
+from .outline import invalidate_outline
+
+CSV_COLUMNS = (
+    'type', 'external_id', 'course', 'title', 'description', 'status', 'instructor',
+    'content', 'video_url', 'order', 'duration_minutes',
+)
+COURSE_UPDATE_FIELDS = ['title', 'description', 'status', 'instructor', 'updated_at']
+LESSON_UPDATE_FIELDS = [
+    'title', 'content', 'video_url', 'order', 'duration_minutes', 'status', 'updated_at',
+]
+COURSE_STATUSES = {key for key, _ in Course.STATUS_CHOICES} - {'deleting'}
+LESSON_STATUSES = {key for key, _ in Lesson.STATUS_CHOICES}
+MAX_REPORTED_ERRORS = 1000
+
+
+# ─────────────────────────────────────────────
+#  Export
+# ─────────────────────────────────────────────
+
+def export_records(chunk_size=2000):
+    """Every course, then every lesson grouped by course, as plain dicts."""
+    courses = (
+        Course.objects.order_by('pk')
+        .values('external_id', 'title', 'description', 'status', 'instructor__username')
+    )
+    for row in courses.iterator(chunk_size=chunk_size):
+        yield {
+            'type':        'course',
+            'external_id': row['external_id'],
+            'title':       row['title'],
+            'description': row['description'],
+            'status':      row['status'],
+            'instructor':  row['instructor__username'],
+        }
+    lessons = (
+        Lesson.objects.filter(course__in=Course.objects.all())
+        .order_by('course_id', 'order', 'pk')
+        .values('course__external_id', 'external_id', 'title', 'content', 'video_url',
+                'order', 'duration_minutes', 'status')
+    )
+    for row in lessons.iterator(chunk_size=chunk_size):
+        yield {
+            'type':             'lesson',
+            'course':           row['course__external_id'],
+            'external_id':      row['external_id'],
+            'title':            row['title'],
+            'content':          row['content'],
+            'video_url':        row['video_url'],
+            'order':            row['order'],
+            'duration_minutes': row['duration_minutes'],
+            'status':           row['status'],
+        }
+
+
+def to_jsonl(records):
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+def to_csv(records):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS, extrasaction='ignore')
+    writer.writeheader()
+    for record in records:
+        writer.writerow(record)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+# ─────────────────────────────────────────────
+#  Import
+# ─────────────────────────────────────────────
+
+def _decoded(lines):
+    for line in lines:
+        yield line.decode('utf-8-sig') if isinstance(line, bytes) else line
+
+
+def read_jsonl(lines):
+    """(line number, record or ValueError) for each non-blank line."""
+    for line_no, line in enumerate(_decoded(lines), start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield line_no, ValueError(f"Invalid JSON: {exc}")
+            continue
+        if not isinstance(record, dict):
+            record = ValueError("Each line must be a JSON object.")
+        yield line_no, record
+
+
+def read_csv(lines):
+    reader = csv.DictReader(_decoded(lines))
+    for row in reader:
+        yield reader.line_num, {key: value for key, value in row.items() if value not in ('', None)}
+
+
+class ImportReport:
+    def __init__(self):
+        self.courses = 0
+        self.lessons = 0
+        self.error_count = 0
+        self.errors = []
+
+    def error(self, line_no, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line_no, str(message)))
+
+    @property
+    def ok(self):
+        return self.error_count == 0
+
+
+def _text(record, key, max_length=None, required=False, default=''):
+    value = record.get(key)
+    if value is None or value == '':
+        if required:
+            raise ValueError(f"'{key}' is required.")
+        return default
+    value = str(value)
+    if max_length and len(value) > max_length:
+        raise ValueError(f"'{key}' is longer than {max_length} characters.")
+    return value
+
+
+def _number(record, key, default=None):
+    value = record.get(key)
+    if value is None or value == '':
+        return default
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{key}' must be a whole number.")
+    if value < 0:
+        raise ValueError(f"'{key}' must not be negative.")
+    return value
+
+
+def _choice(record, key, allowed, default):
+    value = record.get(key) or default
+    if value not in allowed:
+        raise ValueError(f"'{key}' must be one of {', '.join(sorted(allowed))}.")
+    return value
+
+
+def _parse_course(record):
+    return {
+        'external_id': _text(record, 'external_id', 100, required=True),
+        'title':       _text(record, 'title', 255, required=True),
+        'description': _text(record, 'description'),
+        'status':      _choice(record, 'status', COURSE_STATUSES, 'approved'),
+        'instructor':  _text(record, 'instructor', 150) or None,
+    }
+
+
+def _parse_lesson(record):
+    return {
+        'course':           _text(record, 'course', 100, required=True),
+        'external_id':      _text(record, 'external_id', 100, required=True),
+        'title':            _text(record, 'title', 255, required=True),
+        'content':          _text(record, 'content'),
+        'video_url':        _text(record, 'video_url', 200) or None,
+        'order':            _number(record, 'order'),
+        'duration_minutes': _number(record, 'duration_minutes', 0),
+        'status':           _choice(record, 'status', LESSON_STATUSES, 'draft'),
+    }
+
+
+def _upsert(model, rows, report, unique_fields, update_fields):
+    """
+    bulk_create [(line_no, instance)] as one upsert; if the batch is rejected
+    as a whole, retry row by row so only the offending rows are reported.
+    """
+    instances = [instance for _, instance in rows]
+    try:
+        with transaction.atomic():
+            model.objects.bulk_create(
+                instances, update_conflicts=True,
+                unique_fields=unique_fields, update_fields=update_fields,
+            )
+        return len(instances)
+    except DatabaseError:
+        pass
+    written = 0
+    for line_no, instance in rows:
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create(
+                    [instance], update_conflicts=True,
+                    unique_fields=unique_fields, update_fields=update_fields,
+                )
+            written += 1
+        except DatabaseError as exc:
+            report.error(line_no, exc)
+    return written
+
+
+class _Importer:
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.report = ImportReport()
+        self.courses = {}   # external_id -> (line_no, fields); last one wins
+        self.lessons = {}   # (course key, external_id) -> (line_no, fields)
+        self.touched = set()
+        self.positions = {}  # course pk -> order given to the last lesson placed by the import
+
+    def add(self, line_no, record):
+        report = self.report
+        if isinstance(record, Exception):
+            report.error(line_no, record)
+            return
+        kind = record.get('type')
+        try:
+            if kind == 'course':
+                fields = _parse_course(record)
+                self.courses[fields['external_id']] = (line_no, fields)
+            elif kind == 'lesson':
+                fields = _parse_lesson(record)
+                self.lessons[(fields['course'], fields['external_id'])] = (line_no, fields)
+            else:
+                raise ValueError("'type' must be 'course' or 'lesson'.")
+        except ValueError as exc:
+            report.error(line_no, exc)
+            return
+        if len(self.courses) >= self.batch_size:
+            self.flush_courses()
+        if len(self.lessons) >= self.batch_size:
+            self.flush_courses()  # lessons may point at courses still buffered
+            self.flush_lessons()
+
+    def flush_courses(self):
+        if not self.courses:
+            return
+        batch, self.courses = list(self.courses.values()), {}
+        keys = [fields['external_id'] for _, fields in batch]
+        usernames = {fields['instructor'] for _, fields in batch if fields['instructor']}
+        instructors = dict(
+            User.objects.filter(username__in=usernames, role='instructor').values_list('username', 'pk')
+        )
+        deleting = set(
+            Course.all_objects.filter(external_id__in=keys, status='deleting')
+            .values_list('external_id', flat=True)
+        )
+
+        rows = []
+        for line_no, fields in batch:
+            if fields['external_id'] in deleting:
+                self.report.error(line_no, "This course is being deleted.")
+                continue
+            username = fields.pop('instructor')
+            if username and username not in instructors:
+                self.report.error(line_no, f"Unknown instructor '{username}'.")
+                continue
+            rows.append((line_no, Course(instructor_id=instructors.get(username), **fields)))
+
+        self.report.courses += _upsert(Course, rows, self.report, ['external_id'], COURSE_UPDATE_FIELDS)
+        self.touched.update(
+            Course.objects.filter(external_id__in=keys).values_list('pk', flat=True)
+        )
+
+    def flush_lessons(self):
+        if not self.lessons:
+            return
+        batch, self.lessons = list(self.lessons.values()), {}
+        course_ids = dict(
+            Course.objects.filter(external_id__in={fields['course'] for _, fields in batch})
+            .values_list('external_id', 'pk')
+        )
+        # Lessons without an order go after what the course already has;
+        # ones that exist already keep their place.
+        self.positions.update(
+            Lesson.objects.filter(course_id__in=set(course_ids.values()) - set(self.positions))
+            .values('course_id').annotate(top=Max('order')).values_list('course_id', 'top')
+        )
+        current = {
+            (course_id, external_id): order
+            for course_id, external_id, order in Lesson.objects.filter(
+                course_id__in=course_ids.values(),
+                external_id__in={fields['external_id'] for _, fields in batch},
+            ).values_list('course_id', 'external_id', 'order')
+        }
+
+        rows = []
+        for line_no, fields in batch:
+            course_key = fields.pop('course')
+            course_id = course_ids.get(course_key)
+            if course_id is None:
+                self.report.error(line_no, f"Unknown course '{course_key}'.")
+                continue
+            top = self.positions.get(course_id, 0)
+            if fields['order'] is None:
+                fields['order'] = current.get((course_id, fields['external_id']), top + ORDER_STEP)
+            self.positions[course_id] = max(top, fields['order'])
+            rows.append((line_no, Lesson(course_id=course_id, **fields)))
+            self.touched.add(course_id)
+
+        self.report.lessons += _upsert(
+            Lesson, rows, self.report, ['course', 'external_id'], LESSON_UPDATE_FIELDS
+        )
+
+    def finish(self):
+        self.flush_courses()
+        self.flush_lessons()
+        touched = list(self.touched)
+        for start in range(0, len(touched), 500):
+            chunk = touched[start:start + 500]
+            rebuild_counters(Course.objects.filter(pk__in=chunk))
+            invalidate_outline(*chunk)
+            for course_id in chunk:
+                search.reindex_course(course_id)
+        if touched:
+            invalidate_catalog()
+            autocomplete.rebuild()
+        return self.report
+
+
+def import_records(records, batch_size=1000):
+    """Upsert (line number, record) pairs; returns an ImportReport."""
+    importer = _Importer(batch_size)
+    for line_no, record in records:
+        importer.add(line_no, record)
+    return importer.finish()
@@ -0,0 +1,121 @@
+"""
+Resumable chunked uploads for lesson materials and course notes.
+
+A client opens an UploadSession, PUTs numbered chunks of `chunk_size` bytes
+(in any order, retrying any that fail), then finalizes.  Each chunk is
+streamed straight from the request to ``MEDIA_ROOT/uploads/tmp/<session>/``,
+so the status of a session is simply the chunk files on disk.  On finalize
+the chunks are handed to the normal upload form as one `AssembledUpload`,
+which the content-addressed storage reads once, in order, while hashing.
+"""
+
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+
+UPLOAD_TMP_DIR = 'uploads/tmp'
+DEFAULT_CHUNK_SIZE = 5 * 1024 * 1024
+DEFAULT_MAX_SIZE   = 500 * 1024 * 1024
+DEFAULT_TTL        = 24 * 60 * 60
+COPY_BLOCK         = 64 * 1024
+
+
+class ChunkError(ValueError):
+    pass
+
+
+def chunk_size():
+    return getattr(settings, 'UPLOAD_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+
+
+def max_upload_size():
+    return getattr(settings, 'UPLOAD_MAX_SIZE', DEFAULT_MAX_SIZE)
+
+
+def session_ttl():
+    return getattr(settings, 'UPLOAD_SESSION_TTL', DEFAULT_TTL)
+
+
+def session_dir(session):
+    return os.path.join(settings.MEDIA_ROOT, UPLOAD_TMP_DIR, str(session.pk))
+
+
+def _chunk_path(session, index):
+    return os.path.join(session_dir(session), f'{index:06d}.part')
+
+
+def received_chunks(session):
+    """Sorted indexes of the chunks already stored for `session`."""
+    try:
+        names = os.listdir(session_dir(session))
+    except FileNotFoundError:
+        return []
+    return sorted(int(name[:-5]) for name in names if name.endswith('.part'))
+
+
+def write_chunk(session, index, stream):
+    """
+    Copy one chunk from `stream` to disk.  It only becomes visible once its
+    length is exactly what the session expects, so a dropped connection
+    leaves nothing behind and the chunk can simply be sent again.
+    """
+    if not 0 <= index < session.chunk_count:
+        raise ChunkError(f"Chunk index must be between 0 and {session.chunk_count - 1}.")
+    expected = session.chunk_length(index)
+    os.makedirs(session_dir(session), exist_ok=True)
+    final_path = _chunk_path(session, index)
+    # A unique name per attempt: two threads retrying the same chunk must
+    # not write to (or clean up) each other's file.
+    fd, tmp_path = tempfile.mkstemp(dir=session_dir(session), suffix='.tmp')
+
+    written = 0
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while written <= expected:
+                block = stream.read(min(COPY_BLOCK, expected + 1 - written)) if stream else b''
+                if not block:
+                    break
+                out.write(block)
+                written += len(block)
+        if written != expected:
+            raise ChunkError(f"Chunk {index} must be {expected} bytes, got {written}.")
+        os.replace(tmp_path, final_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def missing_chunks(session):
+    return sorted(set(range(session.chunk_count)) - set(received_chunks(session)))
+
+
+def discard_chunks(session):
+    shutil.rmtree(session_dir(session), ignore_errors=True)
+
+
+class AssembledUpload(File):
+    """The session's chunks read back-to-back as a single file."""
+
+    def __init__(self, session):
+        super().__init__(None, name=session.filename)
+        self._paths = [_chunk_path(session, i) for i in range(session.chunk_count)]
+        self.size = session.total_size
+
+    def chunks(self, chunk_size=None):
+        chunk_size = chunk_size or self.DEFAULT_CHUNK_SIZE
+        for path in self._paths:
+            with open(path, 'rb') as handle:
+                while block := handle.read(chunk_size):
+                    yield block
+
+    def multiple_chunks(self, chunk_size=None):
+        return True
+
+    def open(self, mode=None):
+        return self
+
+    def close(self):
+        pass
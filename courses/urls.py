@@ -2,17 +2,18 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 from .views import (
     # API
-    CourseViewSet, LessonViewSet,
+    CourseViewSet, LessonViewSet, UploadSessionViewSet, SearchAPIView,
     # Public / student
-    courses_list, CourseDetailView, LessonDetailView,
+    courses_list, search_courses, course_autocomplete, CourseDetailView, LessonDetailView,
     student_dashboard, enroll_course, unenroll_course,
     # Admin — course management
     admin_course_list, admin_add_course, admin_edit_course, admin_delete_course,
+    admin_export_courses, admin_import_courses, clone_course,
     # Instructor — lesson management
     instructor_dashboard, manage_lessons,
     add_lesson, edit_lesson, delete_lesson,
     # Instructor — material management
-    manage_materials, add_material, delete_material, download_material,
+    manage_materials, add_material, delete_material, download_material, signed_download,
     # Instructor — course notes
     course_notes, upload_course_note, delete_course_note, download_course_note,
 )
@@ -22,11 +23,14 @@ app_name = "courses"
 router = DefaultRouter()
 router.register(r"api/courses", CourseViewSet, basename="course")
 router.register(r"api/lessons", LessonViewSet, basename="lesson")
+router.register(r"api/uploads", UploadSessionViewSet, basename="upload")
 
 urlpatterns = [
     # ── Student ──────────────────────────────────────────
     path("",                                    student_dashboard,  name="student_dashboard"),
     path("browse/",                             courses_list,       name="courses_list"),
+    path("search/",                             search_courses,     name="search"),
+    path("autocomplete/",                       course_autocomplete, name="autocomplete"),
     path("<int:course_id>/",                    CourseDetailView.as_view(), name="course_detail"),
     path("<int:course_id>/enroll/",             enroll_course,      name="enroll_course"),
     path("<int:course_id>/unenroll/",           unenroll_course,    name="unenroll_course"),
@@ -38,6 +42,9 @@ urlpatterns = [
     path("admin/add/",                          admin_add_course,   name="add_course"),
     path("admin/<int:course_id>/edit/",         admin_edit_course,  name="edit_course"),
     path("admin/<int:course_id>/delete/",       admin_delete_course, name="delete_course"),
+    path("admin/export/",                       admin_export_courses, name="export_courses"),
+    path("admin/import/",                       admin_import_courses, name="import_courses"),
+    path("<int:course_id>/clone/",              clone_course,       name="clone_course"),
 
     # ── Instructor — lesson management ───────────────────
     path("instructor/",                         instructor_dashboard, name="instructor_dashboard"),
@@ -57,6 +64,8 @@ urlpatterns = [
          delete_material,  name="delete_material"),
     path("materials/<int:material_id>/download/",
          download_material, name="download_material"),
+    path("materials/signed/<str:token>/",
+         signed_download,   name="signed_download"),
 
     # ── Instructor — course notes ─────────────────────────
     path("<int:course_id>/notes/",
@@ -69,5 +78,6 @@ urlpatterns = [
          download_course_note, name="download_course_note"),
 
     # ── API ───────────────────────────────────────────────
+    path("api/search/", SearchAPIView.as_view(), name="api_search"),
     path("", include(router.urls)),
 ]
@@ -1,40 +1,81 @@
-import os
+from datetime import timedelta
+
 from django.views import View
 from django.shortcuts import get_object_or_404, render, redirect
+from django.core import signing
+from django.db.models.fields.files import FieldFile
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import Http404, FileResponse, HttpResponseForbidden
+from django.http import (
+    Http404, HttpResponseForbidden, HttpResponseGone, JsonResponse, StreamingHttpResponse,
+)
 from django.utils import timezone
 
-from rest_framework import viewsets, status
+from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-
-from .models import Course, Lesson, LessonMaterial, CourseNote
-from .serializers import CourseSerializer, LessonSerializer
+from rest_framework.views import APIView
+
+from .models import Course, Lesson, LessonMaterial, CourseNote, UploadSession
+from .catalog import approved_courses, enrolled_course_ids
+from .deletion import deletion_progress, schedule_course_deletion
+from .delivery import serve_file
+from .signed_urls import freshness_window, sign_download, verify_download
+from .conditional import ConditionalGetMixin, Validators, page_not_modified, queryset_state
+from .outline import lesson_outline
+from .ordering import apply_order, move_lesson, next_order
+from . import search as search_index
+from . import cloning, transfer, uploads
+from .autocomplete import get_index as autocomplete_index
+from .serializers import CourseSerializer, LessonReorderSerializer, LessonSerializer, UploadSessionSerializer
 from .forms import AdminCourseForm, LessonForm, LessonMaterialForm, CourseNoteForm
 from .permissions import IsInstructorOrReadOnly
 from enrollments.models import Enrollment
+from enrollments.guest import read_preview
+from enrollments.services import enroll
+from enrollments.access import (
+    can_access_course, is_enrolled as user_is_enrolled, is_instructor as user_is_instructor,
+)
 from users.models import User
+from elearning.fastlist import FastListMixin
+from elearning.fieldsets import SparseFieldsetsMixin
 
 import logging
 logger = logging.getLogger(__name__)
 
 
 # ─────────────────────────────────────────────
-#  REST API ViewSets (unchanged)
+#  REST API ViewSets
 # ─────────────────────────────────────────────
 
-class CourseViewSet(viewsets.ModelViewSet):
+class CourseViewSet(SparseFieldsetsMixin, ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = Course.objects.filter(status='approved')
     serializer_class = CourseSerializer
     permission_classes = [IsAuthenticated, IsInstructorOrReadOnly]
+    keyset_ordering = ('created_at', 'id')
 
     def list(self, request, *args, **kwargs):
         logger.debug(f"Queryset: {self.queryset}")
         return super().list(request, *args, **kwargs)
 
+    def validator_querysets(self, queryset):
+        # Lessons are nested in the payload, so their edits must change the ETag.
+        return [queryset, Lesson.objects.filter(course__in=queryset)]
+
+    def perform_destroy(self, instance):
+        schedule_course_deletion(instance)
+
+    @action(detail=True, methods=['post'])
+    def clone(self, request, pk=None):
+        """Copy the course with its lessons, files, notes and quizzes into a new pending course."""
+        course = self.get_object()
+        if not user_is_instructor(request, course):
+            raise PermissionDenied("You are not assigned to this course.")
+        copy = cloning.clone_course(course, created_by=request.user, title=request.data.get('title'))
+        return Response(CourseSerializer(copy).data, status=status.HTTP_201_CREATED)
+
     @action(detail=True, methods=['get'])
     def lessons(self, request, pk=None):
         course = self.get_object()
@@ -42,35 +83,218 @@ class CourseViewSet(viewsets.ModelViewSet):
         serializer = LessonSerializer(lessons, many=True)
         return Response(serializer.data)
 
-
-class LessonViewSet(viewsets.ModelViewSet):
-    queryset = Lesson.objects.all()
+    @action(detail=True, methods=['get'])
+    def outline(self, request, pk=None):
+        """Lightweight lesson list (no content) with prev/next ids, served from cache."""
+        course = self.get_object()
+        outline = lesson_outline(course.id, include_drafts=user_is_instructor(request, course))
+        data = []
+        for entry in outline:
+            prev_entry, next_entry = outline.neighbours(entry['id'])
+            data.append({
+                **entry,
+                'previous': prev_entry['id'] if prev_entry else None,
+                'next':     next_entry['id'] if next_entry else None,
+            })
+        return Response(data)
+
+
+class LessonViewSet(SparseFieldsetsMixin, ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
+    queryset = Lesson.objects.exclude(course__status='deleting')
     serializer_class = LessonSerializer
     permission_classes = [IsAuthenticated, IsInstructorOrReadOnly]
+    keyset_ordering = ('created_at', 'id')
 
     def get_queryset(self):
         if self.request.user.role == 'instructor':
-            return Lesson.objects.filter(course__instructor=self.request.user)
+            return self.queryset.filter(course__instructor=self.request.user)
         enrolled = Course.objects.filter(enrollment__student=self.request.user)
         return Lesson.objects.filter(course__in=enrolled, status='published')
 
+    def perform_create(self, serializer):
+        course = serializer.validated_data['course']
+        if 'order' not in self.request.data:
+            serializer.save(order=next_order(course.id))
+        else:
+            serializer.save()
+
+    @action(detail=False, methods=['post'])
+    def reorder(self, request):
+        """
+        Drag and drop: ``{"course": <id>, "lessons": [<id>, ...]}`` with every
+        lesson of the course in its new sequence, applied in one transaction.
+        """
+        serializer = LessonReorderSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        course = serializer.validated_data['course']
+        if not user_is_instructor(request, course):
+            raise PermissionDenied("You are not assigned to this course.")
+        try:
+            changed = apply_order(course.id, serializer.validated_data['lessons'])
+        except ValueError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        outline = lesson_outline(course.id, include_drafts=True)
+        return Response({
+            'changed': changed,
+            'lessons': [{'id': entry['id'], 'order': entry['order']} for entry in outline],
+        })
+
+
+class UploadSessionViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin,
+                           mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    """
+    Resumable uploads: POST to open a session, PUT raw bytes to
+    ``chunks/<n>/``, GET to see which chunks arrived, then POST ``finalize/``.
+    """
+    serializer_class   = UploadSessionSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return UploadSession.objects.filter(
+            owner=self.request.user, expires_at__gt=timezone.now()
+        ).select_related('course', 'lesson')
+
+    def perform_create(self, serializer):
+        if not user_is_instructor(self.request, serializer.validated_data['course']):
+            raise PermissionDenied("You are not assigned to this course.")
+        serializer.save(
+            owner=self.request.user,
+            chunk_size=uploads.chunk_size(),
+            expires_at=timezone.now() + timedelta(seconds=uploads.session_ttl()),
+        )
+
+    def perform_destroy(self, instance):
+        uploads.discard_chunks(instance)
+        instance.delete()
+
+    @action(detail=True, methods=['put'], url_path=r'chunks/(?P<index>\d+)')
+    def chunk(self, request, pk=None, index=None):
+        session = self.get_object()
+        try:
+            uploads.write_chunk(session, int(index), request.stream)
+        except uploads.ChunkError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'index': int(index), 'received': uploads.received_chunks(session)})
+
+    @action(detail=True, methods=['post'])
+    def finalize(self, request, pk=None):
+        session = self.get_object()
+        missing = uploads.missing_chunks(session)
+        if missing:
+            return Response(
+                {'detail': 'Upload incomplete.', 'missing': missing},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        form_class = LessonMaterialForm if session.kind == 'material' else CourseNoteForm
+        form = form_class(
+            data={'title': session.title},
+            files={'file': uploads.AssembledUpload(session)},
+        )
+        if not form.is_valid():
+            return Response(form.errors, status=status.HTTP_400_BAD_REQUEST)
+        obj = form.save(commit=False)
+        if session.kind == 'material':
+            obj.lesson = session.lesson
+        else:
+            obj.course = session.course
+        obj.uploaded_by = request.user
+        obj.save()
+
+        uploads.discard_chunks(session)
+        session.delete()
+        return Response(
+            {'kind': session.kind, 'id': obj.pk, 'title': obj.title, 'filename': obj.filename},
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class SearchAPIView(APIView):
+    """Ranked full-text search, paginated like the rest of the API."""
+
+    page_size     = 20
+    max_page_size = 100
+
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        page, page_size = _page_params(request.query_params, self.page_size, self.max_page_size)
+        total, hits = search_index.search(
+            query, request.user, limit=page_size, offset=(page - 1) * page_size
+        )
+        for hit in hits:
+            hit['snippet'] = search_index.plain(hit['snippet'])
+        return Response({
+            'count':    total,
+            'page':     page,
+            'next':     page + 1 if page * page_size < total else None,
+            'previous': page - 1 if page > 1 else None,
+            'results':  hits,
+        })
+
+
+def _page_params(params, default_size, max_size):
+    try:
+        page = max(int(params.get('page', 1)), 1)
+    except (TypeError, ValueError):
+        page = 1
+    try:
+        page_size = min(max(int(params.get('page_size', default_size)), 1), max_size)
+    except (TypeError, ValueError):
+        page_size = default_size
+    return page, page_size
+
 
 # ─────────────────────────────────────────────
 #  Public / Student views
 # ─────────────────────────────────────────────
 
+SEARCH_PAGE_SIZE = 20
+
+
+def search_courses(request):
+    """Full-text search over courses, lessons, materials and notes."""
+    query = request.GET.get('q', '').strip()
+    page, _ = _page_params(request.GET, SEARCH_PAGE_SIZE, SEARCH_PAGE_SIZE)
+    total, hits = search_index.search(
+        query, request.user, limit=SEARCH_PAGE_SIZE, offset=(page - 1) * SEARCH_PAGE_SIZE
+    )
+    for hit in hits:
+        hit['snippet'] = search_index.highlight(hit['snippet'])
+    return render(request, 'courses/search.html', {
+        'query':     query,
+        'hits':      hits,
+        'total':     total,
+        'page':      page,
+        'has_prev':  page > 1,
+        'has_next':  page * SEARCH_PAGE_SIZE < total,
+    })
+
+
 def courses_list(request):
     """Browse all approved courses — accessible to everyone."""
-    courses = Course.objects.filter(status='approved').order_by('-created_at')
-    enrolled_ids = []
+    courses = approved_courses()
+    enrolled_ids = frozenset()
     if request.user.is_authenticated and request.user.role == 'student':
-        enrolled_ids = list(
-            Enrollment.objects.filter(student=request.user).values_list('course_id', flat=True)
-        )
+        enrolled_ids = enrolled_course_ids(request.user)
     return render(request, 'courses/courses_list.html', {
         'courses': courses,
         'enrolled_course_ids': enrolled_ids,
-        'total_courses': courses.count(),
+        'total_courses': len(courses),
+    })
+
+
+def course_autocomplete(request):
+    """As-you-type course lookup, answered from the in-process prefix index."""
+    try:
+        limit = min(max(int(request.GET.get('limit', 10)), 1), 25)
+    except ValueError:
+        limit = 10
+    matches = autocomplete_index().search(request.GET.get('q', ''), limit=limit)
+    return JsonResponse({
+        'results': [
+            {'id': course_id, 'title': title, 'instructor': instructor}
+            for course_id, title, instructor in matches
+        ],
     })
 
 
@@ -79,21 +303,37 @@ class CourseDetailView(View):
         course = get_object_or_404(Course, id=course_id, status='approved')
         is_enrolled = False
         can_manage  = False
+        preview     = None
         lessons     = []
 
         if request.user.is_authenticated:
-            is_enrolled = Enrollment.objects.filter(student=request.user, course=course).exists()
-            can_manage  = request.user == course.instructor or request.user.role == 'admin'
+            is_enrolled = user_is_enrolled(request.user, course.id)
+            can_manage  = user_is_instructor(request, course)
             if is_enrolled or can_manage:
                 lessons = course.lessons.filter(status='published').order_by('order', 'created_at')
+        else:
+            preview = read_preview(request, course.id)  # signature check only, no query
+            if preview:
+                lessons = course.lessons.filter(status='published').order_by('order', 'created_at')[:1]
 
-        return render(request, 'courses/course_detail.html', {
+        validators = Validators(
+            [(1, course.updated_at), queryset_state(course.lessons.all())],
+            request.user.pk, is_enrolled, can_manage, preview and preview['i'],
+        )
+        not_modified = page_not_modified(request, validators)
+        if not_modified is not None:
+            return not_modified
+
+        response = render(request, 'courses/course_detail.html', {
             'course':       course,
             'is_enrolled':  is_enrolled,
             'can_manage':   can_manage,
             'lessons':      lessons,
-            'lesson_count': course.lessons.filter(status='published').count(),
+            'lesson_count': course.published_lesson_count,
+            'is_guest_preview': preview is not None,
+            'guest_email':      preview['m'] if preview else None,
         })
+        return validators.apply(response, private=True)
 
 
 class LessonDetailView(View):
@@ -101,35 +341,55 @@ class LessonDetailView(View):
         course = get_object_or_404(Course, id=course_id, status='approved')
         lesson = get_object_or_404(Lesson, id=lesson_id, course=course)
 
-        if not request.user.is_authenticated:
-            messages.error(request, "Please log in to access lessons.")
-            return redirect('users:login')
-
-        is_instructor = request.user == course.instructor or request.user.role == 'admin'
-        is_enrolled   = Enrollment.objects.filter(student=request.user, course=course).exists()
+        is_instructor = user_is_instructor(request, course)
+        is_enrolled   = user_is_enrolled(request.user, course.id)
+        preview       = None
 
-        if not (is_enrolled or is_instructor):
+        if not request.user.is_authenticated:
+            # A guest preview opens the first published lesson only.
+            preview = read_preview(request, course.id)
+            first   = next(iter(lesson_outline(course.id)), None)
+            if not (preview and first and first['id'] == lesson.id):
+                messages.error(request, "Please log in to access lessons.")
+                return redirect('users:login')
+
+        if not (is_enrolled or is_instructor or preview):
             messages.error(request, "You must be enrolled to access lessons.")
             return redirect('courses:course_detail', course_id=course.id)
 
-        if request.user.role == 'student' and lesson.status != 'published':
+        if not is_instructor and lesson.status != 'published':
             raise Http404("Lesson not found")
 
-        if is_instructor:
-            all_lessons = course.lessons.all().order_by('order', 'created_at')
-        else:
-            all_lessons = course.lessons.filter(status='published').order_by('order', 'created_at')
+        validators = Validators(
+            [
+                (1, course.updated_at),
+                queryset_state(Lesson.objects.filter(course=course)),
+                queryset_state(lesson.materials.all(), field='uploaded_at'),
+            ],
+            request.user.pk, is_enrolled, is_instructor, preview and preview['i'], freshness_window(),
+        )
+        not_modified = page_not_modified(request, validators)
+        if not_modified is not None:
+            return not_modified
+
+        outline = lesson_outline(course.id, include_drafts=is_instructor)
+        prev_lesson, next_lesson = outline.neighbours(lesson.id)
 
-        materials = lesson.materials.all().order_by('uploaded_at')
+        materials = list(lesson.materials.all().order_by('uploaded_at'))
+        for material in materials:
+            material.signed_url = sign_download(material.file, material.filename)
 
-        return render(request, 'courses/lesson_detail.html', {
+        response = render(request, 'courses/lesson_detail.html', {
             'course':       course,
             'lesson':       lesson,
-            'all_lessons':  all_lessons,
+            'all_lessons':  outline,
+            'prev_lesson':  prev_lesson,
+            'next_lesson':  next_lesson,
             'materials':    materials,
             'is_instructor': is_instructor,
             'is_enrolled':  is_enrolled,
         })
+        return validators.apply(response, private=True)
 
 
 @login_required
@@ -137,8 +397,10 @@ def student_dashboard(request):
     if request.user.role != 'student':
         messages.error(request, "Access denied.")
         return redirect('home')
-    enrolled   = Course.objects.filter(enrollment__student=request.user, status='approved')
-    available  = Course.objects.filter(status='approved').exclude(enrollment__student=request.user)
+    catalog      = approved_courses()
+    enrolled_ids = enrolled_course_ids(request.user)
+    enrolled     = [c for c in catalog if c.id in enrolled_ids]
+    available    = [c for c in catalog if c.id not in enrolled_ids]
     return render(request, 'courses/student_dashboard.html', {
         'enrolled_courses':  enrolled,
         'available_courses': available,
@@ -148,22 +410,14 @@ def student_dashboard(request):
 @login_required
 def enroll_course(request, course_id):
     course = get_object_or_404(Course, id=course_id, status='approved')
-    if request.user.role != 'student':
-        messages.error(request, "Only students can enroll.")
+    try:
+        enrollment, created = enroll(request.user, course)
+    except ValueError as exc:
+        messages.error(request, str(exc))
         return redirect('courses:course_detail', course_id=course.id)
-
-    existing = Enrollment.objects.filter(student=request.user, course=course).first()
-    if existing:
-        return render(request, 'courses/enrollment_success.html', {
-            'course': course, 'enrollment': existing,
-            'already_enrolled': True, 'lessons_count': course.lessons.count(),
-            'instructor': course.instructor,
-        })
-
-    enrollment = Enrollment.objects.create(student=request.user, course=course)
     return render(request, 'courses/enrollment_success.html', {
         'course': course, 'enrollment': enrollment,
-        'already_enrolled': False, 'lessons_count': course.lessons.count(),
+        'already_enrolled': not created, 'lessons_count': course.lesson_count,
         'instructor': course.instructor,
     })
 
@@ -180,13 +434,13 @@ def unenroll_course(request, course_id):
     if request.method == 'POST':
         enrollment.delete()
         return render(request, 'courses/unenrollment_success.html', {
-            'course': course, 'lessons_count': course.lessons.count(),
+            'course': course, 'lessons_count': course.lesson_count,
             'instructor': course.instructor,
         })
 
     return render(request, 'courses/unenroll_confirm.html', {
         'course': course, 'enrollment': enrollment,
-        'lessons_count': course.lessons.count(), 'instructor': course.instructor,
+        'lessons_count': course.lesson_count, 'instructor': course.instructor,
     })
 
 
@@ -207,7 +461,12 @@ def admin_course_list(request):
     if guard:
         return guard
     courses = Course.objects.all().order_by('-created_at')
-    return render(request, 'courses/admin_course_list.html', {'courses': courses})
+    deleting = list(Course.all_objects.filter(status='deleting').order_by('-updated_at'))
+    for course in deleting:
+        course.deletion = deletion_progress(course.pk)
+    return render(request, 'courses/admin_course_list.html', {
+        'courses': courses, 'deleting': deleting,
+    })
 
 
 @login_required
@@ -254,13 +513,62 @@ def admin_delete_course(request, course_id):
         return guard
     course = get_object_or_404(Course, id=course_id)
     if request.method == 'POST':
-        title = course.title
-        course.delete()
-        messages.success(request, f"Course '{title}' deleted.")
+        # Hidden immediately; the rows and files go in the background.
+        schedule_course_deletion(course)
+        messages.success(request, f"Course '{course.title}' is being deleted.")
         return redirect('courses:admin_course_list')
     return render(request, 'courses/delete_course.html', {'course': course})
 
 
+@login_required
+def clone_course(request, course_id):
+    """Copy a course for a new run; the copy starts out pending approval."""
+    course = get_object_or_404(Course, id=course_id)
+    guard  = _require_instructor(request, course)
+    if guard:
+        return guard
+    if request.method != 'POST':
+        return redirect('courses:manage_lessons', course_id=course.id)
+    copy = cloning.clone_course(course, created_by=request.user)
+    messages.success(request, f"Created '{copy.title}'. It is pending approval.")
+    return redirect('courses:manage_lessons', course_id=copy.id)
+
+
+@login_required
+def admin_export_courses(request):
+    """Stream the whole catalog as JSON Lines (or CSV with ?format=csv)."""
+    guard = _require_admin(request)
+    if guard:
+        return guard
+    if request.GET.get('format') == 'csv':
+        lines, content_type, ext = transfer.to_csv(transfer.export_records()), 'text/csv', 'csv'
+    else:
+        lines, content_type, ext = transfer.to_jsonl(transfer.export_records()), 'application/x-ndjson', 'jsonl'
+    response = StreamingHttpResponse(lines, content_type=f'{content_type}; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="courses.{ext}"'
+    return response
+
+
+@login_required
+def admin_import_courses(request):
+    guard = _require_admin(request)
+    if guard:
+        return guard
+    report = None
+    if request.method == 'POST':
+        upload = request.FILES.get('file')
+        if upload is None:
+            messages.error(request, "Choose a .jsonl or .csv file to import.")
+        else:
+            reader = transfer.read_csv if upload.name.lower().endswith('.csv') else transfer.read_jsonl
+            report = transfer.import_records(reader(upload))
+            if report.ok:
+                messages.success(
+                    request, f"Imported {report.courses} course(s) and {report.lessons} lesson(s)."
+                )
+    return render(request, 'courses/admin_course_import.html', {'report': report})
+
+
 # ─────────────────────────────────────────────
 #  INSTRUCTOR — lesson & material management
 # ─────────────────────────────────────────────
@@ -280,9 +588,9 @@ def instructor_dashboard(request):
     if request.user.role not in ('instructor', 'admin'):
         messages.error(request, "Instructor access required.")
         return redirect('home')
-    courses = Course.objects.filter(instructor=request.user).prefetch_related('lessons')
-    total_lessons  = sum(c.lessons.count() for c in courses)
-    total_students = sum(c.enrollment.count() for c in courses)
+    courses = list(Course.objects.filter(instructor=request.user))
+    total_lessons  = sum(c.lesson_count for c in courses)
+    total_students = sum(c.enrollment_count for c in courses)
     return render(request, 'courses/instructor_dashboard.html', {
         'courses':        courses,
         'total_lessons':  total_lessons,
@@ -313,6 +621,11 @@ def add_lesson(request, course_id):
         if form.is_valid():
             lesson = form.save(commit=False)
             lesson.course = course
+            position = form.cleaned_data.get('position')
+            if position:
+                move_lesson(lesson, position - 1)
+            else:
+                lesson.order = next_order(course.id)
             lesson.save()
             messages.success(request, f"Lesson '{lesson.title}' added.")
             return redirect('courses:manage_lessons', course_id=course.id)
@@ -330,14 +643,19 @@ def edit_lesson(request, course_id, lesson_id):
     guard  = _require_instructor(request, course)
     if guard:
         return guard
+    outline_ids = [entry['id'] for entry in lesson_outline(course.id, include_drafts=True)]
+    current_position = outline_ids.index(lesson.id) + 1 if lesson.id in outline_ids else None
     if request.method == 'POST':
         form = LessonForm(request.POST, instance=lesson)
         if form.is_valid():
             form.save()
+            position = form.cleaned_data.get('position')
+            if position and position != current_position:
+                move_lesson(lesson, position - 1)
             messages.success(request, f"Lesson '{lesson.title}' updated.")
             return redirect('courses:manage_lessons', course_id=course.id)
     else:
-        form = LessonForm(instance=lesson)
+        form = LessonForm(instance=lesson, initial={'position': current_position})
     return render(request, 'courses/lesson_form.html', {
         'form': form, 'course': course, 'lesson': lesson, 'action': 'Edit'
     })
@@ -407,9 +725,6 @@ def delete_material(request, course_id, lesson_id, material_id):
     if guard:
         return guard
     if request.method == 'POST':
-        # Delete the actual file from disk
-        if material.file and os.path.isfile(material.file.path):
-            os.remove(material.file.path)
         title = material.title
         material.delete()
         messages.success(request, f"'{title}' deleted.")
@@ -422,18 +737,30 @@ def delete_material(request, course_id, lesson_id, material_id):
 @login_required
 def download_material(request, material_id):
     """Serve a material file — only enrolled students, instructors, or admins."""
-    material = get_object_or_404(LessonMaterial, id=material_id)
+    material = get_object_or_404(LessonMaterial.objects.select_related('lesson__course'), id=material_id)
     course   = material.lesson.course
 
-    is_instructor = request.user == course.instructor or request.user.role == 'admin'
-    is_enrolled   = Enrollment.objects.filter(student=request.user, course=course).exists()
-
-    if not (is_instructor or is_enrolled):
+    if not can_access_course(request, course):
         return HttpResponseForbidden("You do not have access to this file.")
 
-    response = FileResponse(material.file.open('rb'), as_attachment=True,
-                            filename=material.filename)
-    return response
+    return serve_file(request, material.file, material.filename)
+
+
+def signed_download(request, token):
+    """
+    Serve a material from a signed link minted by LessonDetailView.
+    Deliberately touches neither the session nor the database.
+    """
+    try:
+        name, filename = verify_download(token)
+    except signing.SignatureExpired:
+        return HttpResponseGone("This download link has expired. Reload the lesson page.")
+    except signing.BadSignature:
+        return HttpResponseForbidden("Invalid download link.")
+    fieldfile = FieldFile(None, LessonMaterial._meta.get_field('file'), name)
+    if not fieldfile.storage.exists(name):
+        raise Http404("File not found")
+    return serve_file(request, fieldfile, filename)
 
 
 @login_required
@@ -482,8 +809,6 @@ def delete_course_note(request, course_id, note_id):
     if guard:
         return guard
     if request.method == 'POST':
-        if note.file and os.path.isfile(note.file.path):
-            os.remove(note.file.path)
         title = note.title
         note.delete()
         messages.success(request, f"'{title}' deleted.")
@@ -496,14 +821,11 @@ def delete_course_note(request, course_id, note_id):
 @login_required
 def download_course_note(request, note_id):
     """Serve a course note — enrolled students, instructor, or admin only."""
-    note   = get_object_or_404(CourseNote, id=note_id)
+    note   = get_object_or_404(CourseNote.objects.select_related('course'), id=note_id)
     course = note.course
-    is_instructor = request.user == course.instructor or request.user.role == 'admin'
-    is_enrolled   = Enrollment.objects.filter(student=request.user, course=course).exists()
-    if not (is_instructor or is_enrolled):
+    if not can_access_course(request, course):
         return HttpResponseForbidden("You do not have access to this file.")
-    response = FileResponse(note.file.open('rb'), as_attachment=True, filename=note.filename)
-    return response
+    return serve_file(request, note.file, note.filename)
 
 
 # ─────────────────────────────────────────────
@@ -0,0 +1,144 @@
+"""
+Read-only fast path for large API lists.
+
+`ModelSerializer(many=True)` builds a model instance per row and walks every
+field through `get_attribute` / `to_representation`.  For serializers made
+only of plain columns, foreign-key ids and nested lists of the same, the
+output can be produced straight from `QuerySet.values()`:
+`compile_serializer` inspects the serializer class once and returns a
+`FastRows` with one converter per field (``None`` where the DRF field would
+hand the database value back unchanged).  Nested lists are fetched with one
+extra `values()` query per page, like a prefetch.
+
+The rows are plain dicts with the serializer's keys in the serializer's
+order, so the rendered JSON is byte-for-byte what the serializer produces.
+Serializers with anything else (method fields, files, dotted sources) are
+not compiled and keep using the regular path.  `manage.py
+benchmark_list_serializers` compares the two.
+"""
+
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import fields as drf_fields, relations, serializers
+from rest_framework.response import Response
+
+# DRF fields whose to_representation returns these database values as they are.
+_PASSTHROUGH = (
+    drf_fields.CharField, drf_fields.IntegerField, drf_fields.BooleanField,
+    drf_fields.ChoiceField, relations.PrimaryKeyRelatedField,
+)
+_CONVERTED = (
+    drf_fields.DateTimeField, drf_fields.DateField, drf_fields.TimeField,
+    drf_fields.FloatField, drf_fields.DecimalField, drf_fields.UUIDField,
+    drf_fields.DurationField, drf_fields.JSONField,
+)
+
+
+class FastRows:
+    def __init__(self, model, fields, nested):
+        self.model = model
+        self.fields = fields    # [(output key, values() column, converter or None)]
+        self.nested = nested    # [(output key, FastRows, FK column on the child, related manager)]
+        self.columns = [column for _, column, _ in fields if column is not None]
+
+    def values(self, queryset, extra=()):
+        """`queryset` as a values() queryset carrying every column the rows need."""
+        columns = list(dict.fromkeys([*self.columns, self.model._meta.pk.attname, *extra]))
+        return queryset.prefetch_related(None).values(*columns)
+
+    def render(self, rows):
+        """Serialized dicts for `rows` (dicts from `values()`)."""
+        rows = list(rows)
+        pk = self.model._meta.pk.attname
+        children = {}
+        if self.nested and rows:
+            ids = [row[pk] for row in rows]
+            for key, fast, fk, manager in self.nested:
+                grouped = {}
+                child_rows = list(fast.values(manager.filter(**{f"{fk}__in": ids}), extra=[fk]))
+                for child, data in zip(child_rows, fast.render(child_rows)):
+                    grouped.setdefault(child[fk], []).append(data)
+                children[key] = grouped
+
+        fields = self.fields
+        out = []
+        for row in rows:
+            data = {}
+            for key, column, convert in fields:
+                if key in children:
+                    data[key] = children[key].get(row[pk], [])
+                    continue
+                value = row[column]
+                data[key] = convert(value) if convert is not None and value is not None else value
+            out.append(data)
+        return out
+
+
+def _compile(serializer, model):
+    fields, nested = [], []
+    for key, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if field.source == "*" or len(field.source_attrs) != 1:
+            return None
+        name = field.source_attrs[0]
+        try:
+            model_field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+
+        if isinstance(field, serializers.ListSerializer):
+            if not model_field.one_to_many:
+                return None
+            child = _compile(field.child, model_field.related_model)
+            if child is None:
+                return None
+            manager = model_field.related_model._default_manager
+            nested.append((key, child, model_field.field.attname, manager))
+            fields.append((key, None, None))
+            continue
+        if isinstance(field, serializers.BaseSerializer) or not model_field.concrete:
+            return None
+        if isinstance(field, _PASSTHROUGH):
+            convert = None
+        elif isinstance(field, _CONVERTED):
+            convert = field.to_representation
+        else:
+            return None
+        fields.append((key, model_field.attname, convert))
+
+    return FastRows(model, fields, nested)
+
+
+@lru_cache(maxsize=None)
+def compile_serializer(serializer_class):
+    """A FastRows for `serializer_class`, or None if it needs the regular path."""
+    model = getattr(getattr(serializer_class, "Meta", None), "model", None)
+    if model is None:
+        return None
+    return _compile(serializer_class(), model)
+
+
+class FastListMixin:
+    """
+    ViewSet mixin serving `list` from `values()` when the serializer
+    compiles.  Sparse or expanded requests keep the regular path.
+    """
+
+    def get_fast_rows(self):
+        fields, expand = getattr(self, "get_selection", lambda: (None, None))()
+        if fields or expand:
+            return None
+        return compile_serializer(self.get_serializer_class())
+
+    def list(self, request, *args, **kwargs):
+        fast = self.get_fast_rows()
+        if fast is None:
+            return super().list(request, *args, **kwargs)
+        keep = [name.lstrip("-") for name in getattr(self, "keyset_ordering", ())]
+        queryset = fast.values(self.filter_queryset(self.get_queryset()), extra=keep)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(fast.render(page))
+        return Response(fast.render(queryset))
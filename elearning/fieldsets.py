@@ -0,0 +1,175 @@
+"""
+Sparse fieldsets (``?fields=``) and on-demand expansion (``?expand=``) for
+API reads.
+
+    /api/courses/?fields=id,title
+    /api/courses/?fields=id,title,lessons.id,lessons.title
+    /api/enrollments/?expand=student,course&fields=id,student.username,course.title
+
+``fields`` keeps only the named serializer fields; dotted names reach into
+nested serializers.  ``expand`` replaces a foreign-key id with the related
+object, serialized with the class named in the serializer's
+``Meta.expandable_fields``.  The ViewSet then narrows its queryset to match:
+``only()`` the columns behind the kept fields, ``select_related`` for
+expanded foreign keys, and a (narrowed) ``Prefetch`` for nested lists —
+only when they are asked for.  Without either parameter the response is
+unchanged and the ViewSet falls back to its cached plan (queryplan.py).
+"""
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from django.utils.module_loading import import_string
+from rest_framework import serializers
+
+from .queryplan import QueryPlanMixin
+
+
+def parse_selection(value):
+    """'a,b.c,b.d' -> {'a': {}, 'b': {'c': {}, 'd': {}}}; an empty node means "all of it"."""
+    tree = {}
+    for path in (value or "").split(","):
+        node = tree
+        for part in path.strip().split("."):
+            if part:
+                node = node.setdefault(part, {})
+    return tree
+
+
+class SparseFieldsetsSerializerMixin:
+    """
+    Serializer side: accepts ``fields=`` / ``expand=`` (strings or parsed
+    trees) and trims or expands its fields accordingly.
+    """
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.restrict(fields, expand)
+
+    def restrict(self, fields=None, expand=None):
+        """Must be called before `.fields` is first accessed."""
+        self._selected = parse_selection(fields) if isinstance(fields, str) else (fields or None)
+        self._expand = parse_selection(expand) if isinstance(expand, str) else (expand or {})
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selected = self._selected
+        expandable = getattr(self.Meta, "expandable_fields", {})
+
+        for name, sub_expand in self._expand.items():
+            if name not in expandable:
+                continue
+            serializer_class = expandable[name]
+            if isinstance(serializer_class, str):
+                serializer_class = import_string(serializer_class)
+            fields[name] = serializer_class(
+                read_only=True, fields=(selected or {}).get(name) or None, expand=sub_expand,
+            )
+
+        if selected is not None:
+            fields = {name: field for name, field in fields.items() if name in selected}
+        for name, field in fields.items():
+            nested = getattr(field, "child", field)
+            if name in expandable or not isinstance(nested, SparseFieldsetsSerializerMixin):
+                continue
+            sub_fields = (selected or {}).get(name)
+            if sub_fields or self._expand.get(name):
+                nested.restrict(sub_fields, self._expand.get(name))
+        return fields
+
+
+# ─────────────────────────────────────────────
+#  Queryset narrowing
+# ─────────────────────────────────────────────
+
+def _plan(serializer, model, prefix=""):
+    """
+    (only() paths, select_related paths, Prefetch objects) needed to render
+    `serializer` for rows of `model`, with every path under `prefix`.
+    """
+    only, select, prefetch = set(), [], []
+    columns = {field.name for field in model._meta.concrete_fields}
+    narrowable = True
+
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == "*":
+            narrowable = False
+            continue
+        name = field.source_attrs[0]
+        nested = getattr(field, "child", field)
+        if not isinstance(nested, serializers.BaseSerializer):
+            if name in columns and len(field.source_attrs) == 1:
+                only.add(prefix + name)
+            else:
+                narrowable = False  # a property or a dotted source: load the whole row
+            continue
+
+        try:
+            relation = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            narrowable = False
+            continue
+        related = relation.related_model
+        if relation.many_to_one or relation.one_to_one:
+            select.append(prefix + name)
+            sub_only, sub_select, sub_prefetch = _plan(nested, related, f"{prefix}{name}__")
+            only |= sub_only
+            select += sub_select
+            prefetch += sub_prefetch
+        else:
+            keep = [relation.field.name] if relation.one_to_many else []
+            queryset = narrow_queryset(related._default_manager.all(), nested, keep)
+            prefetch.append(Prefetch(prefix + name, queryset=queryset))
+
+    if not narrowable:
+        only |= {prefix + name for name in columns}
+    only.add(prefix + model._meta.pk.name)
+    return only, select, prefetch
+
+
+def narrow_queryset(queryset, serializer, keep=()):
+    """
+    `queryset` restricted to what `serializer` will read.  `keep` names extra
+    columns the caller needs loaded (pagination keys, a prefetch's FK).
+    """
+    only, select, prefetch = _plan(serializer, queryset.model)
+    only.update(name.lstrip("-") for name in keep)
+    only.discard("pk")
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset.only(*only)
+
+
+class SparseFieldsetsMixin(QueryPlanMixin):
+    """
+    ViewSet side: reads ``?fields=`` / ``?expand=`` on list and retrieve,
+    hands them to the serializer and narrows the queryset to match.  Plain
+    requests get the cached plan of the full serializer instead.
+    """
+
+    fields_query_param = "fields"
+    expand_query_param = "expand"
+
+    def get_selection(self):
+        request = getattr(self, "request", None)
+        if request is None or getattr(self, "action", None) not in ("list", "retrieve"):
+            return None, None
+        params = request.query_params
+        return params.get(self.fields_query_param), params.get(self.expand_query_param)
+
+    def get_serializer(self, *args, **kwargs):
+        if issubclass(self.get_serializer_class(), SparseFieldsetsSerializerMixin):
+            fields, expand = self.get_selection()
+            kwargs.setdefault("fields", fields)
+            kwargs.setdefault("expand", expand)
+        return super().get_serializer(*args, **kwargs)
+
+    def apply_query_plan(self, queryset):
+        fields, expand = self.get_selection()
+        if (fields or expand) and issubclass(self.get_serializer_class(), SparseFieldsetsSerializerMixin):
+            keep = getattr(self, "keyset_ordering", ())
+            return narrow_queryset(queryset, self.get_serializer(), keep)
+        return super().apply_query_plan(queryset)
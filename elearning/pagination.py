@@ -0,0 +1,150 @@
+"""
+Keyset (cursor) pagination for the REST API.
+
+Pages are cut with a WHERE on the ordering columns instead of OFFSET, so
+page 10 000 costs the same as page 1: the database seeks straight into the
+composite index on those columns.  Each ViewSet declares its ordering in
+`keyset_ordering`, which must end in a unique column (normally the primary
+key) so ties are broken deterministically.  The default is ``('id',)``.
+
+Cursors are signed, so clients treat them as opaque and cannot hand-craft
+arbitrary WHERE clauses.  `?page_size=` is honoured up to API_MAX_PAGE_SIZE.
+"""
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+SALT = "elearning.pagination.cursor"
+
+
+def page_size():
+    return getattr(settings, "API_PAGE_SIZE", 50)
+
+
+def max_page_size():
+    return getattr(settings, "API_MAX_PAGE_SIZE", 500)
+
+
+def cursor_values(obj, ordering):
+    """The values of `ordering` on a model instance or values() dict, JSON-ready."""
+    values = []
+    for field in ordering:
+        name = field.lstrip("-")
+        value = obj[name] if isinstance(obj, dict) else getattr(obj, name)
+        values.append(value.isoformat() if hasattr(value, "isoformat") else value)
+    return values
+
+
+def seek(ordering, values, reverse=False):
+    """
+    Q for rows strictly after `values` in `ordering` (before, if reverse):
+    (a > x) OR (a = x AND b > y) OR ...
+    """
+    condition = Q()
+    for depth, field in enumerate(ordering):
+        name = field.lstrip("-")
+        descending = field.startswith("-") != reverse
+        step = Q(**{f"{name}__{'lt' if descending else 'gt'}": values[depth]})
+        for prior, value in zip(ordering[:depth], values):
+            step &= Q(**{prior.lstrip("-"): value})
+        condition |= step
+    # Redundant, but a plain range on the leading column is what lets the
+    # database seek into the index instead of scanning it from the start.
+    lead = ordering[0]
+    descending = lead.startswith("-") != reverse
+    return Q(**{f"{lead.lstrip('-')}__{'lte' if descending else 'gte'}": values[0]}) & condition
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return page_size()
+        return max(1, min(size, max_page_size()))
+
+    def get_ordering(self, view):
+        ordering = tuple(getattr(view, "keyset_ordering", ("id",)))
+        if ordering[-1].lstrip("-") not in ("id", "pk"):
+            ordering += ("id",)
+        return ordering
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            return signing.loads(token, salt=SALT)
+        except signing.BadSignature:
+            raise NotFound("Invalid cursor.")
+
+    def encode_cursor(self, values, reverse):
+        return signing.dumps({"v": values, "r": reverse}, salt=SALT, compress=True)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = self.get_ordering(view)
+        self.page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+
+        reverse = bool(cursor and cursor.get("r"))
+        if cursor:
+            try:
+                queryset = queryset.filter(seek(self.ordering, cursor["v"], reverse))
+            except (KeyError, IndexError, TypeError, ValueError, signing.BadSignature):
+                raise NotFound("Invalid cursor.")
+        order_by = [
+            field.lstrip("-") if field.startswith("-") else f"-{field}" for field in self.ordering
+        ] if reverse else list(self.ordering)
+
+        # One extra row tells us whether there is another page.
+        rows = list(queryset.order_by(*order_by)[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        self.first_key = cursor_values(rows[0], self.ordering) if rows else None
+        self.last_key = cursor_values(rows[-1], self.ordering) if rows else None
+        return rows
+
+    def _link(self, values, reverse):
+        url = self.request.build_absolute_uri()
+        if values is None:
+            # Paging back past an empty page: start again from the top.
+            return remove_query_param(url, self.cursor_query_param) if reverse else None
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(values, reverse))
+
+    def get_next_link(self):
+        return self._link(self.last_key, False) if self.has_next else None
+
+    def get_previous_link(self):
+        return self._link(self.first_key, True) if self.has_previous else None
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next":     self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results":  data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next":     {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results":  schema,
+            },
+        }
@@ -0,0 +1,111 @@
+"""
+select_related / prefetch_related derived from a ViewSet's serializer.
+
+The serializer tree is walked once per serializer class (when the ViewSet's
+URLs are built) and the resulting plan is cached: forward foreign keys that
+are rendered as nested objects or reached through a dotted ``source`` are
+joined with ``select_related``; nested lists are prefetched, together with
+anything they render in turn.  List and retrieve then apply the plan, so
+adding a nested serializer can never reintroduce an N+1.
+
+With API_QUERY_COUNT_HEADER on (the default when DEBUG is), every response
+carries ``X-Query-Count`` with the number of SQL statements it ran.
+"""
+
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connection
+from rest_framework import serializers
+
+
+def _relation(model, name):
+    try:
+        return model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+
+
+def _walk(serializer, model, prefix, select, prefetch, prefetched):
+    for field in serializer.fields.values():
+        if field.write_only or field.source == "*":
+            continue
+        nested = getattr(field, "child", field)
+        is_nested = isinstance(nested, serializers.BaseSerializer)
+        # A dotted source ("course.title") hops through relations; so does a
+        # nested serializer through its own source.
+        hops = field.source_attrs if is_nested else field.source_attrs[:-1]
+
+        current, path = model, prefix
+        for hop in hops:
+            relation = _relation(current, hop)
+            if relation is None or not relation.is_relation:
+                break
+            path += hop
+            if relation.many_to_one or relation.one_to_one:
+                (prefetch if prefetched else select).append(path)
+            else:
+                prefetch.append(path)
+                prefetched = True
+            current, path = relation.related_model, path + "__"
+        else:
+            if is_nested:
+                _walk(nested, current, path, select, prefetch, prefetched)
+
+
+@lru_cache(maxsize=None)
+def query_plan(serializer_class):
+    """(select_related paths, prefetch_related paths) for a ModelSerializer class."""
+    model = getattr(getattr(serializer_class, "Meta", None), "model", None)
+    if model is None:
+        return (), ()
+    select, prefetch = [], []
+    _walk(serializer_class(), model, "", select, prefetch, False)
+    return tuple(dict.fromkeys(select)), tuple(dict.fromkeys(prefetch))
+
+
+def query_count_header_enabled():
+    return getattr(settings, "API_QUERY_COUNT_HEADER", settings.DEBUG)
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class QueryPlanMixin:
+    """ViewSet mixin applying the cached `query_plan` of its serializer on list and retrieve."""
+
+    @classmethod
+    def as_view(cls, *args, **kwargs):
+        if getattr(cls, "serializer_class", None) is not None:
+            query_plan(cls.serializer_class)  # build the plan up front, not on the first request
+        return super().as_view(*args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if getattr(self, "action", None) in ("list", "retrieve"):
+            queryset = self.apply_query_plan(queryset)
+        return queryset
+
+    def apply_query_plan(self, queryset):
+        select, prefetch = query_plan(self.get_serializer_class())
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
+
+    def dispatch(self, request, *args, **kwargs):
+        if not query_count_header_enabled():
+            return super().dispatch(request, *args, **kwargs)
+        counter = _QueryCounter()
+        with connection.execute_wrapper(counter):
+            response = super().dispatch(request, *args, **kwargs)
+        response["X-Query-Count"] = str(counter.count)
+        return response
@@ -86,8 +86,16 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny",
     ],
+    "DEFAULT_PAGINATION_CLASS": "elearning.pagination.KeysetPagination",
 }
 
+# API list pages (elearning/pagination.py); clients may ask for up to the max.
+API_PAGE_SIZE = int(os.getenv("API_PAGE_SIZE", "50"))
+API_MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", "500"))
+
+# Adds X-Query-Count to API responses (elearning/queryplan.py).
+API_QUERY_COUNT_HEADER = os.getenv("API_QUERY_COUNT_HEADER", str(DEBUG)).lower() == "true"
+
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
@@ -153,6 +161,31 @@ DATABASES = {
 }
 
 
+# Caches
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# The course catalog gets its own alias so it can be pointed at a shared
+# backend (e.g. django.core.cache.backends.filebased.FileBasedCache) on its own.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Course catalog and autocomplete snapshots (courses/catalog.py).  Each
+    # student's enrolled course ids are only cached here when the backend is
+    # shared by all workers (Redis, Memcached, database, file); with the
+    # default per-process LocMem they are read from the database instead.
+    "catalog": {
+        "BACKEND": os.getenv(
+            "CATALOG_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CATALOG_CACHE_LOCATION", "catalog"),
+        "TIMEOUT": int(os.getenv("CATALOG_CACHE_TIMEOUT", "300")),
+    },
+}
+
+CATALOG_CACHE_ALIAS = "catalog"
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -195,6 +228,39 @@ STATICFILES_DIRS = [
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
+
+# Material / note downloads: "python" streams from Django with Range support,
+# "x-sendfile" (Apache, lighttpd) or "x-accel-redirect" (nginx) hand the
+# transfer to the fronting web server once access has been checked.
+COURSE_FILE_DELIVERY = os.getenv("COURSE_FILE_DELIVERY", "python")
+COURSE_FILE_ACCEL_PREFIX = os.getenv("COURSE_FILE_ACCEL_PREFIX", "/protected-media/")
+COURSE_FILE_CHUNK_SIZE = int(os.getenv("COURSE_FILE_CHUNK_SIZE", str(256 * 1024)))
+
+# Lifetime (seconds) of the signed material links minted on lesson pages.
+SIGNED_DOWNLOAD_MAX_AGE = int(os.getenv("SIGNED_DOWNLOAD_MAX_AGE", "600"))
+
+# Resumable chunked uploads (courses/uploads.py).
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(5 * 1024 * 1024)))
+UPLOAD_MAX_SIZE = int(os.getenv("UPLOAD_MAX_SIZE", str(500 * 1024 * 1024)))
+UPLOAD_SESSION_TTL = int(os.getenv("UPLOAD_SESSION_TTL", str(24 * 60 * 60)))
+
+# Rows removed per transaction when a course is deleted (courses/deletion.py).
+COURSE_DELETE_CHUNK_SIZE = int(os.getenv("COURSE_DELETE_CHUNK_SIZE", "500"))
+
+# Students resolved and inserted per batch by bulk enrollment (enrollments/services.py).
+BULK_ENROLL_BATCH_SIZE = int(os.getenv("BULK_ENROLL_BATCH_SIZE", "1000"))
+
+# Retries (with exponential backoff starting at ENROLL_RETRY_BACKOFF seconds)
+# when an enrollment hits a SQLite write lock.
+ENROLL_LOCK_RETRIES = int(os.getenv("ENROLL_LOCK_RETRIES", "5"))
+ENROLL_RETRY_BACKOFF = float(os.getenv("ENROLL_RETRY_BACKOFF", "0.05"))
+
+# Lifetime, in seconds, of a guest's signed course-preview cookie.
+GUEST_PREVIEW_TTL = int(os.getenv("GUEST_PREVIEW_TTL", str(24 * 60 * 60)))
+
+# Expired guest previews removed per transaction by `manage.py purge_guest_previews`.
+GUEST_PREVIEW_PURGE_BATCH_SIZE = int(os.getenv("GUEST_PREVIEW_PURGE_BATCH_SIZE", "500"))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
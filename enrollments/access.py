@@ -0,0 +1,36 @@
+"""
+Enrollment access checks that avoid the database on the hot path.
+
+"Is this user enrolled?" is answered from the user's set of enrolled course
+ids (see courses.catalog) when the catalog cache is shared by every worker,
+where the Enrollment save/delete signals keep it current; with a
+per-process cache it is a single indexed EXISTS instead.
+"Does this user teach / administer the course?" is remembered on the request,
+so a view and the helpers it calls never decide it twice.
+"""
+
+from courses.catalog import catalog_cache, enrolled_course_ids, shared_across_processes
+from .models import Enrollment
+
+
+def is_enrolled(user, course_id):
+    if not user.is_authenticated:
+        return False
+    if not shared_across_processes(catalog_cache()):
+        return Enrollment.objects.filter(student=user, course_id=course_id).exists()
+    return course_id in enrolled_course_ids(user)
+
+
+def is_instructor(request, course):
+    """True for the course's assigned instructor or any admin."""
+    user = request.user
+    if not user.is_authenticated:
+        return False
+    memo = request.__dict__.setdefault('_course_instructor_memo', {})
+    if course.pk not in memo:
+        memo[course.pk] = course.instructor_id == user.pk or user.role == 'admin'
+    return memo[course.pk]
+
+
+def can_access_course(request, course):
+    return is_instructor(request, course) or is_enrolled(request.user, course.pk)
@@ -1,5 +1,13 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.db.models import BooleanField, Case, Count, Q, When
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
+from django.utils.html import format_html
+
+from .forms import BulkEnrollmentForm
 from .models import Enrollment, GuestPreview
+from .services import enroll_cohort, summarize
 
 
 @admin.register(Enrollment)
@@ -8,24 +16,105 @@ class EnrollmentAdmin(admin.ModelAdmin):
     list_filter = ('enrolled_at', 'course')
     search_fields = ('student__username', 'course__title')
     readonly_fields = ('enrolled_at',)
+    change_list_template = 'admin/enrollments/enrollment/change_list.html'
+
+    def get_urls(self):
+        return [
+            path(
+                'bulk-enroll/',
+                self.admin_site.admin_view(self.bulk_enroll_view),
+                name='enrollments_enrollment_bulk_enroll',
+            ),
+        ] + super().get_urls()
+
+    def bulk_enroll_view(self, request):
+        """Enroll a cohort from a CSV / JSON file or a pasted list of usernames or emails."""
+        if not self.has_add_permission(request):
+            return self.admin_site.login(request)
+        results = None
+        form = BulkEnrollmentForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            try:
+                identifiers = form.identifiers()
+            except (ValueError, UnicodeDecodeError) as exc:
+                form.add_error(None, f"Could not read the list: {exc}")
+            else:
+                try:
+                    results = enroll_cohort(form.cleaned_data['course'], identifiers)
+                except ValueError as exc:
+                    form.add_error('course', str(exc))
+                else:
+                    summary = summarize(results)
+                    messages.success(
+                        request,
+                        f"{summary['enrolled']} enrolled, {summary['already_enrolled']} already enrolled, "
+                        f"{len(results) - summary['enrolled'] - summary['already_enrolled']} not enrolled.",
+                    )
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Bulk enroll students',
+            'form': form,
+            'problems': [r for r in results or [] if r['status'] not in ('enrolled', 'already_enrolled')],
+        }
+        return TemplateResponse(request, 'admin/enrollments/enrollment/bulk_enroll.html', context)
+
+
+def _active_preview_q():
+    # A preview without an expiry never expires (see GuestPreview.is_expired).
+    return Q(expires_at__gt=timezone.now()) | Q(expires_at__isnull=True)
+
+
+class PreviewStatusFilter(admin.SimpleListFilter):
+    title = 'status'
+    parameter_name = 'status'
+
+    def lookups(self, request, model_admin):
+        return (('active', 'Active'), ('expired', 'Expired'))
+
+    def queryset(self, request, queryset):
+        if self.value() == 'active':
+            return queryset.filter(_active_preview_q())
+        if self.value() == 'expired':
+            return queryset.filter(expires_at__lte=timezone.now())
+        return queryset
 
 
 @admin.register(GuestPreview)
 class GuestPreviewAdmin(admin.ModelAdmin):
     list_display = ('guest_email', 'course', 'preview_started_at', 'expires_at', 'is_expired_status')
-    list_filter = ('preview_started_at', 'expires_at', 'course')
+    list_filter = (PreviewStatusFilter, 'preview_started_at', 'expires_at', 'course')
+    list_select_related = ('course',)
     search_fields = ('guest_email', 'course__title', 'guest_session_id')
     readonly_fields = ('preview_started_at', 'last_accessed_at', 'guest_session_id')
-    
+    change_list_template = 'admin/enrollments/guestpreview/change_list.html'
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            expired=Case(
+                When(expires_at__lte=timezone.now(), then=True),
+                default=False,
+                output_field=BooleanField(),
+            )
+        )
+
+    def changelist_view(self, request, extra_context=None):
+        """Active vs expired totals, counted in one aggregate query."""
+        counts = GuestPreview.objects.aggregate(
+            active=Count('pk', filter=_active_preview_q()),
+            expired=Count('pk', filter=Q(expires_at__lte=timezone.now())),
+        )
+        extra_context = {**(extra_context or {}), 'preview_counts': counts}
+        return super().changelist_view(request, extra_context=extra_context)
+
+    @admin.display(description='Status', ordering='expired')
     def is_expired_status(self, obj):
         """Display expiration status as a colored indicator"""
-        from django.utils.html import format_html
-        if obj.is_expired():
+        if obj.expired:
             return format_html('<span style="color: red;">❌ Expired</span>')
         else:
             return format_html('<span style="color: green;">✅ Active</span>')
-    is_expired_status.short_description = 'Status'
-    
+
     fieldsets = (
         ('Guest Information', {
             'fields': ('guest_email', 'guest_session_id')
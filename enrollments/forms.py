@@ -1,5 +1,7 @@
 from django import forms
 
+from courses.models import Course
+
 
 class EnrollmentForm(forms.Form):
     full_name = forms.CharField(max_length=255)
@@ -26,3 +28,29 @@ class GuestPreviewForm(forms.Form):
         if not email:
             raise forms.ValidationError("Email is required to preview the course.")
         return email
+
+
+class BulkEnrollmentForm(forms.Form):
+    """A course plus a CSV / JSON file or pasted list of usernames or emails."""
+    course = forms.ModelChoiceField(queryset=Course.objects.filter(status="approved"))
+    file = forms.FileField(
+        required=False,
+        help_text="CSV with a username or email column (or one per line), or a JSON list.",
+    )
+    students = forms.CharField(
+        required=False,
+        widget=forms.Textarea(attrs={"rows": 8}),
+        help_text="Or paste usernames / emails, one per line.",
+    )
+
+    def clean(self):
+        cleaned = super().clean()
+        if not cleaned.get("file") and not cleaned.get("students"):
+            raise forms.ValidationError("Upload a file or paste a list of students.")
+        return cleaned
+
+    def identifiers(self):
+        from .services import parse_identifiers
+
+        upload = self.cleaned_data.get("file")
+        return parse_identifiers(upload.read() if upload else self.cleaned_data["students"])
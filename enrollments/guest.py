@@ -0,0 +1,132 @@
+"""
+Stateless guest previews.
+
+A guest who asks to preview a course gets a signed, expiring cookie (one per
+course) carrying the course id, a keyed hash of their email, a masked copy
+of the email for display and the expiry time.  Course pages verify it with
+the signature alone: no session, no database.
+
+`GuestPreview` is kept purely for analytics; the row is written from a
+single background worker so the request never waits on the SQLite write
+lock.  `purge_expired_previews` (``manage.py purge_guest_previews``) sweeps
+expired rows in small batches, one short transaction each.
+"""
+
+import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core import signing
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+
+logger = logging.getLogger(__name__)
+
+SALT = "enrollments.guest.preview"
+COOKIE_PREFIX = "guest_preview_"
+
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="guest-preview")
+
+
+def preview_ttl():
+    return getattr(settings, "GUEST_PREVIEW_TTL", 24 * 60 * 60)
+
+
+def purge_batch_size():
+    return getattr(settings, "GUEST_PREVIEW_PURGE_BATCH_SIZE", 500)
+
+
+def cookie_name(course_id):
+    return f"{COOKIE_PREFIX}{course_id}"
+
+
+def email_hash(email):
+    return salted_hmac(SALT, email.strip().lower()).hexdigest()[:32]
+
+
+def mask_email(email):
+    local, _, domain = email.partition("@")
+    return f"{local[:1]}***@{domain}"
+
+
+def issue_preview(response, course_id, email):
+    """Set the preview cookie for `course_id` on `response`; returns the token payload."""
+    ttl = preview_ttl()
+    payload = {
+        "c": course_id,
+        "e": email_hash(email),
+        "m": mask_email(email),
+        "x": int(time.time()) + ttl,
+        "i": uuid.uuid4().hex,
+    }
+    response.set_cookie(
+        cookie_name(course_id),
+        signing.dumps(payload, salt=SALT, compress=True),
+        max_age=ttl,
+        httponly=True,
+        samesite="Lax",
+        secure=settings.SESSION_COOKIE_SECURE,
+    )
+    return payload
+
+
+def read_preview(request, course_id):
+    """The verified, unexpired preview payload for `course_id`, or None."""
+    token = request.COOKIES.get(cookie_name(course_id))
+    if not token:
+        return None
+    try:
+        payload = signing.loads(token, salt=SALT, max_age=preview_ttl())
+    except signing.BadSignature:
+        return None
+    if payload.get("c") != course_id or payload.get("x", 0) <= time.time():
+        return None
+    return payload
+
+
+def _record(course_id, email, payload):
+    from .models import GuestPreview
+
+    try:
+        GuestPreview.objects.create(
+            course_id=course_id,
+            guest_email=email,
+            guest_session_id=payload["i"],
+            expires_at=datetime.fromtimestamp(payload["x"], tz=dt_timezone.utc),
+        )
+    except Exception:
+        logger.exception("Recording guest preview of course %s failed", course_id)
+    finally:
+        close_old_connections()
+
+
+def record_preview(course_id, email, payload, background=True):
+    """Write the analytics row for an issued preview, off the request path by default."""
+    if background:
+        _writer.submit(_record, course_id, email, payload)
+    else:
+        _record(course_id, email, payload)
+
+
+def purge_expired_previews(batch_size=None, before=None):
+    """
+    Delete GuestPreview rows that expired before `before` (default: now),
+    `batch_size` primary keys per transaction so the write lock is only ever
+    held briefly.  Returns the number of rows deleted.
+    """
+    from .models import GuestPreview
+
+    batch_size = batch_size or purge_batch_size()
+    expired = GuestPreview.objects.filter(expires_at__lte=before or timezone.now())
+    deleted = 0
+    while True:
+        pks = list(expired.order_by("expires_at").values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            return deleted
+        batch = GuestPreview.objects.filter(pk__in=pks)
+        with transaction.atomic():
+            deleted += batch._raw_delete(batch.db)
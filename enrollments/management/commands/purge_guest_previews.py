@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from enrollments.guest import purge_expired_previews
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired guest previews in small batches. Safe to run from cron "
+        "while the site is serving traffic."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None,
+                            help="Rows deleted per transaction (default: GUEST_PREVIEW_PURGE_BATCH_SIZE).")
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_previews(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Purged {deleted} expired guest preview(s)."))
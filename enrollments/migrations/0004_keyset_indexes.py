@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-18 18:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('enrollments', '0003_guestpreview'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['enrolled_at', 'id'], name='enrollment_enrolled_id_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-18 19:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('enrollments', '0004_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['course', 'enrolled_at', 'id'], name='enrollment_course_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['student', 'enrolled_at', 'id'], name='enrollment_student_feed_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-18 19:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('enrollments', '0005_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='guestpreview',
+            index=models.Index(fields=['expires_at'], name='guestpreview_expires_idx'),
+        ),
+    ]
@@ -22,6 +22,13 @@ class Enrollment(models.Model):
             "student",
             "course",
         ]  # A student cannot enroll twice in the same course
+        indexes = [
+            # Keyset pagination order (elearning/pagination.py).
+            models.Index(fields=["enrolled_at", "id"], name="enrollment_enrolled_id_idx"),
+            # The enrollment feed, filtered by course or by student.
+            models.Index(fields=["course", "enrolled_at", "id"], name="enrollment_course_feed_idx"),
+            models.Index(fields=["student", "enrolled_at", "id"], name="enrollment_student_feed_idx"),
+        ]
 
     def __str__(self):
         return f"{self.student.username} enrolled in {self.course.title}"
@@ -49,6 +56,10 @@ class GuestPreview(models.Model):
         ]
         verbose_name = "Guest Preview"
         verbose_name_plural = "Guest Previews"
+        indexes = [
+            # The expired-preview sweep and the admin's active / expired counts.
+            models.Index(fields=["expires_at"], name="guestpreview_expires_idx"),
+        ]
     
     def save(self, *args, **kwargs):
         if not self.expires_at:
@@ -58,7 +69,7 @@ class GuestPreview(models.Model):
     
     def is_expired(self):
         """Check if guest preview has expired"""
-        return timezone.now() > self.expires_at
+        return self.expires_at is not None and timezone.now() > self.expires_at
     
     def __str__(self):
         return f"Guest preview of {self.course.title} by {self.guest_email}"
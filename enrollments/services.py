@@ -0,0 +1,217 @@
+"""
+Enrollment writes.
+
+`enroll` is the one way a single student gets enrolled.  It inserts first
+and falls back to fetching the existing row on a unique-constraint
+violation, so concurrent clicks can neither create a duplicate nor fail
+with an IntegrityError, and the write transaction is as short as one
+INSERT.  SQLite lock errors ("database is locked") are retried with
+jittered exponential backoff, here and per `enroll_cohort` batch.
+
+`enroll_cohort` enrolls a whole list of students in one course: identifiers
+(usernames or emails) are resolved with one ``IN`` query per batch, the new
+rows go in with ``bulk_create(ignore_conflicts=True)`` so the
+(student, course) unique constraint absorbs duplicates, and the course
+counter and the students' cached enrolled ids are updated once per batch
+rather than per row (bulk_create skips signals).  Only approved courses
+accept a cohort.
+"""
+
+import csv
+import io
+import json
+import random
+import time
+
+from django.conf import settings
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Lower
+
+from courses.catalog import invalidate_enrolled
+from courses.counters import bump_counters
+from courses.models import Course
+from users.models import User
+from .models import Enrollment
+
+ENROLLED = "enrolled"
+ALREADY_ENROLLED = "already_enrolled"
+DUPLICATE = "duplicate"
+NOT_FOUND = "not_found"
+NOT_STUDENT = "not_student"
+
+
+def bulk_batch_size():
+    return getattr(settings, "BULK_ENROLL_BATCH_SIZE", 1000)
+
+
+def lock_retries():
+    return getattr(settings, "ENROLL_LOCK_RETRIES", 5)
+
+
+def retry_backoff():
+    return getattr(settings, "ENROLL_RETRY_BACKOFF", 0.05)
+
+
+def _is_lock_error(exc):
+    message = str(exc).lower()
+    return "database is locked" in message or "database table is locked" in message
+
+
+def _with_lock_retries(write):
+    """Call `write`, retrying SQLite lock errors with jittered exponential backoff."""
+    # Inside someone else's transaction a retry cannot start over cleanly.
+    retries = 0 if connection.in_atomic_block else lock_retries()
+    for attempt in range(retries + 1):
+        try:
+            return write()
+        except OperationalError as exc:
+            if attempt == retries or not _is_lock_error(exc):
+                raise
+            time.sleep(retry_backoff() * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+
+def _check_enrollable(course):
+    if course.status != "approved":
+        raise ValueError("Only approved courses accept enrollments.")
+
+
+def enroll(student, course):
+    """
+    Enroll `student` in `course` if they are not already; returns
+    (enrollment, created).  Safe to call any number of times, concurrently.
+    Raises ValueError unless the course is approved and `student` is a student.
+    """
+    _check_enrollable(course)
+    if student.role != "student":
+        raise ValueError("Only students can enroll.")
+
+    def write():
+        try:
+            with transaction.atomic():
+                return Enrollment.objects.create(student=student, course=course), True
+        except IntegrityError:
+            # Only the unique constraint means "already enrolled"; anything
+            # else (e.g. the course deleted meanwhile) is a real error.
+            existing = Enrollment.objects.filter(student=student, course=course).first()
+            if existing is None:
+                raise
+            return existing, False
+
+    return _with_lock_retries(write)
+
+
+def parse_identifiers(data):
+    """
+    Usernames / emails from a JSON list (of strings or of objects with a
+    "username" or "email" key) or from CSV text — one per line, or a
+    header row naming a "username" or "email" column.
+    """
+    if isinstance(data, bytes):
+        data = data.decode("utf-8-sig")
+    if isinstance(data, str):
+        text = data.strip()
+        if text.startswith("["):
+            data = json.loads(text)
+        else:
+            rows = list(csv.reader(io.StringIO(text)))
+            header = [cell.strip().lower() for cell in rows[0]] if rows else []
+            column = next((header.index(name) for name in ("username", "email") if name in header), None)
+            if column is None:
+                return [row[0].strip() for row in rows if row and row[0].strip()]
+            return [row[column].strip() for row in rows[1:] if len(row) > column and row[column].strip()]
+    identifiers = []
+    for item in data or []:
+        if isinstance(item, dict):
+            item = item.get("username") or item.get("email") or ""
+        identifiers.append(str(item).strip())
+    return identifiers
+
+
+def _resolve(identifiers):
+    """{identifier: (user id, role)} for the identifiers that match a user."""
+    emails = [value.lower() for value in identifiers if "@" in value]
+    users = (
+        User.objects.annotate(email_lower=Lower("email"))
+        .filter(Q(username__in=identifiers) | Q(email_lower__in=emails))
+        .values_list("pk", "username", "email", "role")
+    )
+    by_username, by_email = {}, {}
+    for pk, username, email, role in users:
+        by_username[username] = (pk, role)
+        if email:
+            by_email.setdefault(email.lower(), (pk, role))
+    return {
+        value: by_username.get(value) or by_email.get(value.lower())
+        for value in identifiers
+        if value in by_username or value.lower() in by_email
+    }
+
+
+def _enroll_batch(course, batch):
+    """Enroll one batch of (row number, identifier); returns per-row result dicts."""
+    matches = _resolve([identifier for _, identifier in batch])
+    results, candidates = [], {}
+    for row, identifier in batch:
+        result = {"row": row, "identifier": identifier, "student": None}
+        match = matches.get(identifier)
+        if match is None:
+            result["status"] = NOT_FOUND
+        elif match[1] != "student":
+            result["status"] = NOT_STUDENT
+        else:
+            result["student"] = match[0]
+            candidates.setdefault(match[0], []).append(result)
+        results.append(result)
+
+    student_ids = list(candidates)
+    with transaction.atomic():
+        # Writing first takes SQLite's write lock, so no concurrent enroll()
+        # can add a row between the check below and the insert: `existing`
+        # is exactly what this batch does not insert.  It also re-checks the
+        # course is still approved.
+        if not Course.objects.filter(pk=course.pk, status="approved").update(
+            enrollment_count=F("enrollment_count")
+        ):
+            raise ValueError("Only approved courses accept enrollments.")
+        existing = set(
+            Enrollment.objects.filter(course=course, student_id__in=student_ids)
+            .values_list("student_id", flat=True)
+        )
+        new = [pk for pk in student_ids if pk not in existing]
+        Enrollment.objects.bulk_create(
+            [Enrollment(course=course, student_id=pk) for pk in new], ignore_conflicts=True
+        )
+        bump_counters(course.pk, enrollment_count=len(new))
+
+    for pk, rows in candidates.items():
+        rows[0]["status"] = ALREADY_ENROLLED if pk in existing else ENROLLED
+        for duplicate in rows[1:]:
+            duplicate["status"] = DUPLICATE
+    invalidate_enrolled(*new)
+    return results
+
+
+def enroll_cohort(course, identifiers, batch_size=None):
+    """
+    Enroll every student named in `identifiers` in `course`.  Returns one
+    result per identifier, in input order: {"row", "identifier", "student",
+    "status"} with status one of enrolled, already_enrolled, duplicate,
+    not_found or not_student.  Raises ValueError unless the course is approved.
+    """
+    _check_enrollable(course)
+    batch_size = batch_size or bulk_batch_size()
+    rows = [(row, identifier) for row, identifier in enumerate(identifiers, start=1) if identifier]
+    results = []
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        results += _with_lock_retries(lambda: _enroll_batch(course, batch))
+    return results
+
+
+def summarize(results):
+    """{status: count} over enroll_cohort results."""
+    summary = dict.fromkeys((ENROLLED, ALREADY_ENROLLED, DUPLICATE, NOT_FOUND, NOT_STUDENT), 0)
+    for result in results:
+        summary[result["status"]] += 1
+    return summary
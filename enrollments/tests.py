@@ -1,3 +1,150 @@
-from django.test import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
 
-# Create your tests here.
+from django.db import IntegrityError, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from courses.models import Course
+from users.models import User
+from .access import is_enrolled
+from .models import Enrollment
+from .services import ENROLLED, enroll, enroll_cohort
+
+
+# The in-memory test database is shared-cache SQLite, which reports table
+# locks immediately instead of waiting out the busy timeout like a database
+# file does, so contention here is far worse than in production.
+@override_settings(ENROLL_LOCK_RETRIES=20)
+class ConcurrentEnrollmentTests(TransactionTestCase):
+    """Hundreds of simultaneous enrollments, each on its own connection."""
+
+    THREADS = 32
+
+    def setUp(self):
+        self.course = Course.objects.create(title="Launch", description="Day one")
+
+    def _run(self, calls):
+        barrier = Barrier(min(self.THREADS, len(calls)))
+
+        def call(student):
+            try:
+                barrier.wait(timeout=10)
+            except Exception:
+                pass  # the tail of the batch: no full party left to wait for
+            try:
+                return enroll(student, self.course)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=self.THREADS) as pool:
+            return list(pool.map(call, calls))
+
+    def test_same_student_clicking_repeatedly_gets_one_enrollment(self):
+        student = User.objects.create_user("eager", password="x", role="student")
+        results = self._run([student] * 200)
+
+        self.assertEqual(sum(created for _, created in results), 1)
+        self.assertEqual(len({enrollment.pk for enrollment, _ in results}), 1)
+        self.assertEqual(Enrollment.objects.filter(student=student).count(), 1)
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.enrollment_count, 1)
+
+    def test_many_students_enrolling_at_once(self):
+        students = User.objects.bulk_create(
+            [User(username=f"student{n}", role="student", password="!") for n in range(300)]
+        )
+        results = self._run(students + students[:50])
+
+        self.assertEqual(sum(created for _, created in results), 300)
+        self.assertEqual(Enrollment.objects.filter(course=self.course).count(), 300)
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.enrollment_count, 300)
+
+    def test_bulk_enrollment_racing_single_enrollments(self):
+        students = User.objects.bulk_create(
+            [User(username=f"cohort{n}", role="student", password="!") for n in range(200)]
+        )
+        usernames = [student.username for student in students]
+
+        def bulk():
+            try:
+                return enroll_cohort(self.course, usernames, batch_size=20)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            cohort = pool.submit(bulk)
+            singles = pool.submit(self._run, students[::2])
+            results, singles = cohort.result(), singles.result()
+
+        # Each enrollment is reported as new by exactly one of the two paths.
+        created = sum(created for _, created in singles)
+        self.assertEqual(sum(r["status"] == ENROLLED for r in results) + created, 200)
+        self.assertEqual(Enrollment.objects.filter(course=self.course).count(), 200)
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.enrollment_count, 200)
+
+    def test_bulk_enrollment_needs_an_approved_course(self):
+        User.objects.create_user("late", password="x", role="student")
+        self.course.status = "pending"
+        self.course.save()
+        with self.assertRaises(ValueError):
+            enroll_cohort(self.course, ["late"])
+        self.assertFalse(Enrollment.objects.exists())
+
+
+class EnrollmentRulesTests(TestCase):
+    """The API, the web views and bulk enrollment all go through services.enroll."""
+
+    def setUp(self):
+        self.instructor = User.objects.create_user("teacher", password="x", role="instructor")
+        self.student = User.objects.create_user("learner", password="x", role="student")
+        self.other = User.objects.create_user("other", password="x", role="student")
+        self.course = Course.objects.create(title="Open", description="x", instructor=self.instructor)
+
+    def _post(self, user, **data):
+        self.client.force_login(user)
+        return self.client.post("/api/enrollments/", data, content_type="application/json", secure=True)
+
+    def test_students_can_only_enroll_themselves(self):
+        response = self._post(self.student, course=self.course.pk, student=self.other.pk)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["student"], self.student.pk)
+        self.assertFalse(Enrollment.objects.filter(student=self.other).exists())
+
+    def test_the_instructor_may_enroll_a_student(self):
+        response = self._post(self.instructor, course=self.course.pk, student=self.other.pk)
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Enrollment.objects.filter(student=self.other, course=self.course).exists())
+
+    def test_only_approved_courses_accept_enrollments(self):
+        self.course.status = "pending"
+        self.course.save()
+        self.assertEqual(self._post(self.student, course=self.course.pk).status_code, 400)
+        self.assertFalse(Enrollment.objects.exists())
+
+    def test_only_students_can_enroll(self):
+        with self.assertRaises(ValueError):
+            enroll(self.instructor, self.course)
+
+
+class EnrollIntegrityTests(TransactionTestCase):
+    def test_integrity_errors_other_than_a_duplicate_propagate(self):
+        student = User.objects.create_user("learner", password="x", role="student")
+        vanished = Course(pk=424242, title="Gone", status="approved")
+        with self.assertRaises(IntegrityError):
+            enroll(student, vanished)
+
+
+class IsEnrolledTests(TestCase):
+    def setUp(self):
+        self.student = User.objects.create_user("learner", password="x", role="student")
+        self.course = Course.objects.create(title="Open", description="x")
+
+    def test_per_process_cache_answers_from_the_database(self):
+        # LocMem (the default) cannot be invalidated across workers.
+        with self.assertNumQueries(1):
+            self.assertFalse(is_enrolled(self.student, self.course.pk))
+        # As another worker would: no signal reaches this process's cache.
+        Enrollment.objects.bulk_create([Enrollment(student=self.student, course=self.course)])
+        self.assertTrue(is_enrolled(self.student, self.course.pk))
@@ -1,21 +1,83 @@
 from django.contrib import messages
 from django.shortcuts import get_object_or_404, redirect, render
-from rest_framework import viewsets
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.generics import get_object_or_404 as get_api_object_or_404
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
-from django.core.paginator import Paginator
+from django.core import signing
+from django.http import JsonResponse, StreamingHttpResponse
 from django.utils import timezone
-import uuid
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.utils.urls import replace_query_param
+from datetime import datetime, time
+import json
 
 from courses.models import Course
-from .models import Enrollment, GuestPreview
+from elearning.fastlist import FastListMixin
+from elearning.fieldsets import SparseFieldsetsMixin
+from elearning.pagination import cursor_values, max_page_size, page_size, seek
+from .models import Enrollment
+from .access import is_enrolled, is_instructor
+from .guest import issue_preview, read_preview, record_preview
 from .serializers import EnrollmentSerializer
+from .services import enroll, enroll_cohort, parse_identifiers, summarize
 from .forms import EnrollmentForm, GuestPreviewForm
 
 
-class EnrollmentViewSet(viewsets.ModelViewSet):
-    queryset = Enrollment.objects.all()
+class EnrollmentViewSet(SparseFieldsetsMixin, FastListMixin, viewsets.ModelViewSet):
+    queryset = Enrollment.objects.exclude(course__status="deleting")
     serializer_class = EnrollmentSerializer
+    permission_classes = [IsAuthenticated]
+    keyset_ordering = ("enrolled_at", "id")
+
+    def create(self, request, *args, **kwargs):
+        """
+        Idempotent: repeating the request returns the existing enrollment with
+        200.  Only the course's instructor or an admin may name another
+        `student`; everyone else enrolls themselves.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        course = serializer.validated_data["course"]
+        student = serializer.validated_data.get("student")
+        if student is None or not is_instructor(request, course):
+            student = request.user
+        try:
+            enrollment, created = enroll(student, course)
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        data = self.get_serializer(enrollment).data
+        return Response(
+            data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+            headers=self.get_success_headers(data),
+        )
+
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """
+        Enroll a cohort: ``{"course": <id>, "students": [<username or email>, ...]}``,
+        or multipart with ``course`` and a CSV / JSON ``file``.  Returns a
+        result per row.
+        """
+        if not str(request.data.get("course", "")).isdigit():
+            return Response({"detail": "'course' must be an id."}, status=status.HTTP_400_BAD_REQUEST)
+        course = get_api_object_or_404(Course, pk=int(request.data["course"]))
+        if not is_instructor(request, course):
+            raise PermissionDenied("You are not assigned to this course.")
+        upload = request.FILES.get("file")
+        try:
+            identifiers = parse_identifiers(upload.read() if upload else request.data.get("students"))
+        except (ValueError, UnicodeDecodeError) as exc:
+            return Response({"detail": f"Could not read the list: {exc}"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            results = enroll_cohort(course, identifiers)
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"course": course.pk, "summary": summarize(results), "results": results})
 
 
 @login_required
@@ -24,18 +86,21 @@ def enroll_course(request, course_id):
     student = request.user
 
     # Check if the student is already enrolled
-    if Enrollment.objects.filter(student=student, course=course).exists():
+    if is_enrolled(student, course.id):
         messages.warning(request, "You are already enrolled in this course.")
         return redirect("courses:course_detail", course_id=course.id)
 
     if request.method == "POST":
         form = EnrollmentForm(request.POST)
         if form.is_valid():
-            enrollment = form.save(commit=False)
-            enrollment.student = student  # Assign the logged-in student
-            enrollment.course = course  # Assign the selected course
-            enrollment.course = course
-            enrollment.save()
+            try:
+                _, created = enroll(student, course)
+            except ValueError as exc:
+                messages.error(request, str(exc))
+                return redirect("courses:course_detail", course_id=course.id)
+            if not created:
+                messages.warning(request, "You are already enrolled in this course.")
+                return redirect("courses:course_detail", course_id=course.id)
             messages.success(request, "Enrollment successful!")
             return redirect("users:student_dashboard")  # Redirect to student dashboard
     else:
@@ -49,56 +114,32 @@ def enroll_course(request, course_id):
 def guest_preview_course(request, course_id):
     """
     Allow guests (unauthenticated users) to preview courses without permanent enrollment.
-    Creates a temporary GuestPreview record that expires after 24 hours.
+    Access is a signed cookie that expires after 24 hours (see enrollments/guest.py);
+    the GuestPreview analytics row is written in the background.
     """
     course = get_object_or_404(Course, id=course_id)
-    
+
     # Check if user is already authenticated
     if request.user.is_authenticated:
         messages.info(request, "You are logged in. You can enroll in courses directly.")
         return redirect("courses:course_detail", course_id=course.id)
-    
-    # Generate or retrieve guest session ID
-    guest_session_id = request.session.get('guest_session_id')
-    if not guest_session_id:
-        guest_session_id = str(uuid.uuid4())
-        request.session['guest_session_id'] = guest_session_id
-    
+
+    if read_preview(request, course.id):
+        messages.info(request, f"Welcome back! Your preview of {course.title} is still active.")
+        return redirect("courses:course_detail", course_id=course.id)
+
     if request.method == "POST":
         form = GuestPreviewForm(request.POST)
         if form.is_valid():
-            email = form.cleaned_data.get('email')
-            
-            # Check if this guest already has preview access (within 24 hours)
-            existing_preview = GuestPreview.objects.filter(
-                course=course,
-                guest_session_id=guest_session_id,
-                guest_email=email
-            ).first()
-            
-            if existing_preview and not existing_preview.is_expired():
-                # Reuse existing preview
-                preview = existing_preview
-                preview.last_accessed_at = timezone.now()
-                preview.save()
-                messages.info(request, f"Welcome back! You can preview {course.title} for the next 24 hours.")
-            else:
-                # Create new guest preview
-                preview = GuestPreview.objects.create(
-                    course=course,
-                    guest_email=email,
-                    guest_session_id=guest_session_id
-                )
-                messages.success(request, f"Guest preview access granted! You can access {course.title} for 24 hours.")
-            
-            # Store in session for verification
-            request.session['guest_course_id'] = course_id
-            request.session['guest_email'] = email
-            
-            return redirect("courses:course_detail", course_id=course.id)
+            email = form.cleaned_data.get("email")
+            response = redirect("courses:course_detail", course_id=course.id)
+            payload = issue_preview(response, course.id, email)
+            record_preview(course.id, email, payload)
+            messages.success(request, f"Guest preview access granted! You can access {course.title} for 24 hours.")
+            return response
     else:
         form = GuestPreviewForm()
-    
+
     context = {
         'form': form,
         'course': course,
@@ -107,11 +148,103 @@ def guest_preview_course(request, course_id):
     return render(request, "enrollments/guest_preview_form.html", context)
 
 
+FEED_ORDERING = ("enrolled_at", "id")
+FEED_COLUMNS = ("id", "enrolled_at", "student_id", "student__username", "course_id", "course__title")
+FEED_CURSOR_SALT = "enrollments.feed.cursor"
+FEED_EXPORT_CHUNK = 2000
+
+
+def _feed_row(row):
+    return {
+        "id":          row["id"],
+        "enrolled_at": row["enrolled_at"].isoformat(),
+        "student_id":  row["student_id"],
+        "student":     row["student__username"],
+        "course_id":   row["course_id"],
+        "course":      row["course__title"],
+    }
+
+
+def _feed_queryset(request):
+    """Enrollments the user may see, narrowed by the query-string filters."""
+    user = request.user
+    enrollments = Enrollment.objects.exclude(course__status="deleting")
+    if user.role == "instructor":
+        enrollments = enrollments.filter(course__instructor=user)
+    elif user.role != "admin":
+        enrollments = enrollments.filter(student=user)
+
+    params = request.GET
+    for key, lookup in (("course", "course_id"), ("student", "student_id")):
+        if params.get(key):
+            if not params[key].isdigit():
+                raise ValueError(f"'{key}' must be an id.")
+            enrollments = enrollments.filter(**{lookup: int(params[key])})
+    for key, lookup in (("since", "enrolled_at__gte"), ("until", "enrolled_at__lt")):
+        if params.get(key):
+            value = parse_datetime(params[key])
+            if value is None:
+                day = parse_date(params[key])
+                if day is None:
+                    raise ValueError(f"'{key}' must be an ISO 8601 date or datetime.")
+                value = datetime.combine(day, time.min)
+            if timezone.is_naive(value):
+                value = timezone.make_aware(value)
+            enrollments = enrollments.filter(**{lookup: value})
+    return enrollments.values(*FEED_COLUMNS)
+
+
+def _feed_page(enrollments, after, size):
+    if after is not None:
+        enrollments = enrollments.filter(seek(FEED_ORDERING, after))
+    return list(enrollments.order_by(*FEED_ORDERING)[:size])
+
+
+def _feed_export(enrollments):
+    """Every matching row as NDJSON, fetched in keyset chunks so no read stays open long."""
+    after = None
+    while True:
+        rows = _feed_page(enrollments, after, FEED_EXPORT_CHUNK)
+        for row in rows:
+            yield json.dumps(_feed_row(row)) + "\n"
+        if len(rows) < FEED_EXPORT_CHUNK:
+            return
+        after = cursor_values(rows[-1], FEED_ORDERING)
+
+
+@login_required
 def enrollments_list(request):
-    enrollments = Enrollment.objects.select_related("student").all()
-    paginator = Paginator(enrollments, 10)
-    page_number = request.GET.get("page", 1)
-    page_obj = paginator.get_page(page_number)
+    """
+    Enrollment feed: filter with ``course``, ``student``, ``since`` and
+    ``until``; page with ``cursor`` / ``limit`` (seek pagination on
+    (enrolled_at, id), so no COUNT and no OFFSET).  ``?format=ndjson``
+    streams every matching row instead.
+    """
+    try:
+        enrollments = _feed_queryset(request)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    if request.GET.get("format") == "ndjson":
+        response = StreamingHttpResponse(_feed_export(enrollments), content_type="application/x-ndjson")
+        response["Content-Disposition"] = 'attachment; filename="enrollments.ndjson"'
+        return response
+
+    try:
+        after = signing.loads(request.GET["cursor"], salt=FEED_CURSOR_SALT) if request.GET.get("cursor") else None
+    except signing.BadSignature:
+        return JsonResponse({"error": "Invalid cursor."}, status=400)
+    try:
+        size = max(1, min(int(request.GET.get("limit", page_size())), max_page_size()))
+    except ValueError:
+        return JsonResponse({"error": "'limit' must be a number."}, status=400)
 
-    data = [{"id": e.id, "student": e.student.username} for e in page_obj]
-    return JsonResponse({"enrollments": data})
+    rows = _feed_page(enrollments, after, size + 1)
+    next_url = None
+    if len(rows) > size:
+        rows = rows[:size]
+        token = signing.dumps(cursor_values(rows[-1], FEED_ORDERING), salt=FEED_CURSOR_SALT)
+        next_url = request.build_absolute_uri(
+            replace_query_param(request.get_full_path(), "cursor", token)
+        )
+    return JsonResponse({"enrollments": [_feed_row(row) for row in rows], "next": next_url})
@@ -1,8 +1,9 @@
 from rest_framework import viewsets
+from elearning.queryplan import QueryPlanMixin
 from .models import Progress
 from .serializers import ProgressSerializer
 
 
-class ProgressViewSet(viewsets.ModelViewSet):
-    queryset = Progress.objects.all()
+class ProgressViewSet(QueryPlanMixin, viewsets.ModelViewSet):
+    queryset = Progress.objects.exclude(lesson__course__status="deleting")
     serializer_class = ProgressSerializer
@@ -11,6 +11,9 @@ class Quiz(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=["created_at", "id"], name="quiz_created_id_idx")]
+
     def __str__(self):
         return self.title
 
@@ -40,6 +43,12 @@ class Submission(models.Model):
         null=True, blank=True
     )  # Instructor will assign the score later
 
+    class Meta:
+        indexes = [
+            # Keyset pagination order (elearning/pagination.py).
+            models.Index(fields=["submitted_at", "id"], name="submission_submitted_id_idx"),
+        ]
+
     def __str__(self):
         return f"{self.student.username} - {self.quiz.title}"
 
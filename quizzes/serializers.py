@@ -1,33 +1,48 @@
 from rest_framework import serializers
+
+from elearning.fieldsets import SparseFieldsetsSerializerMixin
 from .models import Quiz, Question, Submission, Answer
 
 
-class QuestionSerializer(serializers.ModelSerializer):
+class QuestionSerializer(SparseFieldsetsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Question
         fields = "__all__"
+        expandable_fields = {"quiz": "quizzes.serializers.QuizSerializer"}
 
 
-class QuizSerializer(serializers.ModelSerializer):
+class QuizSerializer(SparseFieldsetsSerializerMixin, serializers.ModelSerializer):
     questions = QuestionSerializer(many=True, read_only=True)
 
     class Meta:
         model = Quiz
         fields = "__all__"
+        expandable_fields = {
+            "course": "courses.serializers.CourseSerializer",
+            "instructor": "users.serializers.PublicUserSerializer",
+        }
 
 
-class AnswerSerializer(serializers.ModelSerializer):
+class AnswerSerializer(SparseFieldsetsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Answer
         fields = "__all__"
+        expandable_fields = {
+            "submission": "quizzes.serializers.SubmissionSerializer",
+            "question": "quizzes.serializers.QuestionSerializer",
+        }
 
 
-class SubmissionSerializer(serializers.ModelSerializer):
+class SubmissionSerializer(SparseFieldsetsSerializerMixin, serializers.ModelSerializer):
     answers = AnswerSerializer(many=True, write_only=True)
 
     class Meta:
         model = Submission
         fields = "__all__"
+        expandable_fields = {
+            "student": "users.serializers.PublicUserSerializer",
+            "quiz": "quizzes.serializers.QuizSerializer",
+        }
 
     def create(self, validated_data):
         answers_data = validated_data.pop("answers")
@@ -1,5 +1,6 @@
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
+from elearning.fieldsets import SparseFieldsetsMixin
 from .models import Quiz, Question, Submission, Answer
 from .serializers import (
     QuizSerializer,
@@ -11,25 +12,27 @@ from rest_framework.response import Response
 from rest_framework.decorators import action
 
 
-class QuizViewSet(viewsets.ModelViewSet):
-    queryset = Quiz.objects.all()
+class QuizViewSet(SparseFieldsetsMixin, viewsets.ModelViewSet):
+    queryset = Quiz.objects.exclude(course__status="deleting")
     serializer_class = QuizSerializer
     permission_classes = [IsAuthenticated]
+    keyset_ordering = ("created_at", "id")
 
 
-class QuestionViewSet(viewsets.ModelViewSet):
-    queryset = Question.objects.all()
+class QuestionViewSet(SparseFieldsetsMixin, viewsets.ModelViewSet):
+    queryset = Question.objects.exclude(quiz__course__status="deleting")
     serializer_class = QuestionSerializer
     permission_classes = [IsAuthenticated]
 
 
-class SubmissionViewSet(viewsets.ModelViewSet):
-    queryset = Submission.objects.all()
+class SubmissionViewSet(SparseFieldsetsMixin, viewsets.ModelViewSet):
+    queryset = Submission.objects.exclude(quiz__course__status="deleting")
     serializer_class = SubmissionSerializer
     permission_classes = [IsAuthenticated]
     """"
     This will allow the instructor to assign scores
     """
+    keyset_ordering = ("submitted_at", "id")
 
     @action(detail=True, methods=["post"], url_path="grade")
     def grade_submission(self, request, pk=None):
@@ -48,7 +51,7 @@ class SubmissionViewSet(viewsets.ModelViewSet):
         return Response({"message": "Score assigned successfully."})
 
 
-class AnswerViewSet(viewsets.ModelViewSet):
-    queryset = Answer.objects.all()
+class AnswerViewSet(SparseFieldsetsMixin, viewsets.ModelViewSet):
+    queryset = Answer.objects.exclude(submission__quiz__course__status="deleting")
     serializer_class = AnswerSerializer
     permission_classes = [IsAuthenticated]
@@ -6,6 +6,8 @@ from quizzes.serializers import AnswerSerializer
 from .models import User
 from rest_framework import serializers
 
+from elearning.fieldsets import SparseFieldsetsSerializerMixin
+
 User = get_user_model()
 
 
@@ -19,10 +21,19 @@ class LoginView(TokenObtainPairView):
     permission_classes = [AllowAny]
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = "id", "username", "email", "password"
+        extra_kwargs = {"password": {"write_only": True}}
+
+
+class PublicUserSerializer(SparseFieldsetsSerializerMixin, serializers.ModelSerializer):
+    """What other users may see of a user: used when an API response expands one."""
+
+    class Meta:
+        model = User
+        fields = "id", "username"
 
 
 def create(self, validated_data):
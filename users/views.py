@@ -3,6 +3,7 @@ from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.views import LoginView
 from rest_framework import viewsets, permissions
+from elearning.fieldsets import SparseFieldsetsMixin
 from .serializers import UserSerializer
 from django.views.generic import CreateView
 from django.contrib import messages
@@ -20,9 +21,9 @@ def custom_logout(request):
     return redirect('home')
 
 
-class UserViewset(viewsets.ModelViewSet):
+class UserViewset(SparseFieldsetsMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
-    serializer = UserSerializer
+    serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):